@@ -0,0 +1,98 @@
+from State import pack_calls, pack_floors
+import Constants
+
+from collections import OrderedDict
+
+class DecisionCache:
+    """
+    Memoizes a move logic function on a packed integer key of everything
+    the built-in controllers look at: each elevator's location, last action
+    and destination buttons, plus the hall calls. Only wrap deterministic
+    logic that keeps no state between calls (e.g. Models.look, not
+    Models.GroupDispatch).
+    """
+    def __init__(self, logic, maxsize: int = 4096) -> None:
+        """
+        Args:
+            logic: the move logic function to wrap
+            maxsize: the max number of cached decisions, least recently used
+                     ones are evicted first
+        """
+        self.logic = logic
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self._cache: OrderedDict[int, list] = OrderedDict()
+
+    @staticmethod
+    def key(view: dict) -> int:
+        """
+        Packs the parts of a State.sys_view() that the controllers depend on
+        into a single int. Assumes fewer than 1024 floors and v_max < 64.
+
+        Args:
+            view: the view to pack
+        Returns:
+            the packed key
+        """
+        n_floors = view['n_floors']
+        v_max = view['v_max']
+        n_actions = 2 * v_max + 4   # no past, moves, and the 2 open door states
+        # the leading 1 keeps zero-valued fields, and so the number of
+        # elevators, from vanishing at the top of the key
+        key = (1 << (2 * n_floors)) | pack_calls(view['hall_calls'])
+        for i in range(len(view) - 3):
+            info = view[f"E{i}"]
+            past = info['past']
+            if len(past) == 0:
+                action = 0
+            elif past[-1] == Constants.OPEN_UP:
+                action = 2 * v_max + 2
+            elif past[-1] == Constants.OPEN_DOWN:
+                action = 2 * v_max + 3
+            else:
+                action = past[-1] + v_max + 1
+            dests = pack_floors(info['destinations'])
+            key = (((key << n_floors) | dests) * n_floors + info['location']) * n_actions + action
+        return (key * 64 + v_max) * 1024 + n_floors
+
+    def __call__(self, view: dict) -> list[int|float]:
+        key = self.key(view)
+        actions = self._cache.get(key)
+        if actions is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return list(actions)
+        self.misses += 1
+        actions = list(self.logic(view))
+        self._cache[key] = actions
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return list(actions)
+
+    def hit_rate(self) -> float:
+        """
+        Returns the fraction of calls answered from the cache.
+        """
+        calls = self.hits + self.misses
+        return self.hits / calls if calls != 0 else 0.0
+
+    def clear(self) -> None:
+        """
+        Empties the cache and resets the statistics.
+        """
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def summarize(self) -> dict:
+        """
+        Provide a summary of the cache usage, in the same format as
+        State.summarize().
+        """
+        return {
+            'cache hits' : self.hits,
+            'cache misses' : self.misses,
+            'cache size' : len(self._cache),
+            'hit rate' : round(self.hit_rate(), 3)
+        }
@@ -0,0 +1,188 @@
+from State import State
+import Constants
+
+import math
+import random
+from statistics import NormalDist
+
+def _t_critical(df: int, confidence: float) -> float:
+    """
+    Approximates the two-sided Student-t critical value with a Cornish-Fisher
+    expansion around the normal quantile.
+
+    Args:
+        df: degrees of freedom
+        confidence: the confidence level, e.g. 0.95
+    Returns:
+        the critical value
+    """
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    z3, z5, z7 = z ** 3, z ** 5, z ** 7
+    return z + (z3 + z) / (4 * df) \
+             + (5 * z5 + 16 * z3 + 3 * z) / (96 * df ** 2) \
+             + (3 * z7 + 19 * z5 + 17 * z3 - 15 * z) / (384 * df ** 3)
+
+def _mean_ci(samples: list[float], confidence: float) -> tuple[float, float, float]:
+    """
+    Computes the sample mean and its confidence interval.
+
+    Returns:
+        (mean, lower bound, upper bound)
+    """
+    n = len(samples)
+    mean = sum(samples) / n
+    if n < 2:
+        return mean, -math.inf, math.inf
+    var = sum((x - mean) ** 2 for x in samples) / (n - 1)
+    half = _t_critical(n - 1, confidence) * math.sqrt(var / n)
+    return mean, mean - half, mean + half
+
+def _look_schedule(min_runs: int, max_runs: int) -> list[int]:
+    """
+    The run counts at which the data is looked at: doubling from min_runs,
+    but at least 5 runs so that the t approximation holds, always ending at
+    max_runs.
+    """
+    looks = []
+    runs = max(5, min_runs)
+    while runs < max_runs:
+        looks.append(runs)
+        runs *= 2
+    looks.append(max_runs)
+    return looks
+
+def _simultaneous_cis(diffs: dict, alpha: float) -> dict:
+    """
+    Confidence intervals of several mean paired differences that all hold
+    together with probability 1 - alpha (Bonferroni).
+
+    Args:
+        diffs: a dictionary of {name : list of paired differences}
+        alpha: the family-wise error rate
+    Returns:
+        a dictionary of {name : (mean, lower bound, upper bound)}
+    """
+    return {name: _mean_ci(samples, 1 - alpha / len(diffs)) for name, samples in diffs.items()}
+
+def _excludes_zero(ci: tuple[float, float, float]) -> bool:
+    return ci[1] > 0 or ci[2] < 0
+
+def paired_run(controllers: list,
+               floors: int = Constants.N_FLOORS,
+               n_elevators: int = Constants.N_ELEVATORS,
+               avg_ppl: float = Constants.AVG_PPL_PER_FLOOR_TICK,
+               ppl_generation_profile: list[float] = None,
+               test_cycles: int = Constants.N_STEPS,
+               max_linger: int = Constants.N_TRAILING_STEPS,
+               arrivals: list[list[tuple[int, int]]] = None) -> list[float]:
+    """
+    Runs one simulation per controller in lockstep. The arrivals are drawn
+    once per step and fed to every state, so the controllers see identical
+    traffic (common random numbers).
+
+    Args:
+        controllers: the move logic functions to compare
+        floors, n_elevators, avg_ppl, ppl_generation_profile: see State
+        test_cycles: the number of steps with arrivals
+        max_linger: the max number of extra steps to empty the building
+        arrivals: precomputed arrivals for each step, e.g. from
+                  Traffic.TrafficModel.arrivals_by_tick(). Drawn from the
+                  arrival profile if None.
+    Returns:
+        the total cost of each controller's state, in order
+    """
+    states = [State(logic=logic,
+                    floors=floors,
+                    n_elevators=n_elevators,
+                    avg_ppl=avg_ppl,
+                    ppl_generation_profile=ppl_generation_profile)
+              for logic in controllers]
+    for t in range(test_cycles):
+        step_arrivals = states[0].sample_arrivals() if arrivals is None else arrivals[t]
+        for state in states:
+            state.update(arrivals=step_arrivals)
+    for _ in range(max_linger):
+        lingering = [state for state in states if state.n_active != 0]
+        if len(lingering) == 0:
+            break
+        for state in lingering:
+            state.update(add_ppl=False)
+    return [state.total_cost() for state in states]
+
+def paired_compare(controllers: dict,
+                   baseline: str = None,
+                   min_runs: int = 10,
+                   max_runs: int = 1000,
+                   confidence: float = 0.95,
+                   seed: int = None,
+                   **sim_args) -> dict:
+    """
+    Compares controllers with paired runs on common arrival streams, and
+    stops early once every controller's difference to the baseline is
+    significant.
+
+    The data is only looked at after min_runs, 2*min_runs, 4*min_runs, ...
+    and max_runs runs. The error rate 1 - confidence is split evenly over
+    those looks, and at each look over the controllers (Bonferroni), so
+    stopping early keeps the overall chance of calling any difference
+    significant when there is none below 1 - confidence. A difference is
+    significant when its reported interval excludes 0.
+
+    Args:
+        controllers: a dictionary of {name : move logic function}
+        baseline: the name of the controller to compare against, defaults to
+                  the first one
+        min_runs: the number of runs at the first look
+        max_runs: the max number of runs
+        confidence: the overall confidence level
+        seed: seed for the arrival streams
+        sim_args: forwarded to paired_run()
+    Returns:
+        a dictionary in the format
+        {
+            'runs' : <number-of-paired-runs>,
+            'significant' : <whether-all-differences-are-significant>,
+            <name> : {'mean cost' : float,
+                      'diff' : <mean-paired-difference-to-baseline>,
+                      'ci' : (<lower>, <upper>),  # simultaneous over the controllers
+                      'significant' : bool},
+            ...
+        }
+    """
+    names = list(controllers)
+    if len(names) < 2:
+        raise ValueError("Need at least two controllers to compare")
+    if baseline is None:
+        baseline = names[0]
+    others = [name for name in names if name != baseline]
+    if seed is not None:
+        random.seed(seed)
+
+    looks = _look_schedule(min_runs, max_runs)
+    alpha = (1 - confidence) / len(looks)
+    costs = {name: [] for name in names}
+    runs = 0
+    for look in looks:
+        while runs < look:
+            run_costs = paired_run([controllers[name] for name in names], **sim_args)
+            for name, cost in zip(names, run_costs):
+                costs[name].append(float(cost))
+            runs += 1
+        diffs = {name: [a - b for a, b in zip(costs[name], costs[baseline])] for name in others}
+        cis = _simultaneous_cis(diffs, alpha)
+        if all(_excludes_zero(ci) for ci in cis.values()):
+            break
+
+    result = {'runs': runs}
+    for name in names:
+        mean_cost = sum(costs[name]) / runs
+        if name == baseline:
+            result[name] = {'mean cost': mean_cost}
+            continue
+        diff, lo, hi = cis[name]
+        result[name] = {'mean cost': mean_cost,
+                        'diff': diff,
+                        'ci': (lo, hi),
+                        'significant': _excludes_zero(cis[name])}
+    result['significant'] = all(result[name]['significant'] for name in others)
+    return result
@@ -0,0 +1,114 @@
+from State import State
+from Vis import pretty_list as lstr
+
+import sys
+import time
+from collections import deque
+
+class Dashboard:
+    """
+    A live terminal view of a running State. Frames are throttled to a target
+    rate independently of the simulation speed, and only the lines that
+    changed since the last frame are redrawn. Besides the building, it shows
+    the simulation speed, the move logic's decision latency and rolling
+    percentiles of the delivered people's total times.
+    """
+    def __init__(self, target_fps: float = 10, window: int = 1000, stream = None) -> None:
+        """
+        Args:
+            target_fps: the max number of frames per second
+            window: the number of recent decisions and deliveries the
+                    statistics are computed over
+            stream: where to draw, defaults to stdout
+        """
+        self.frame_s: float = 1 / target_fps
+        self.stream = sys.stdout if stream is None else stream
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.waits: deque[int] = deque(maxlen=window)
+        self._lines: list[str] = []
+        self._last_frame: float = -float('inf')
+        self._last_time: int = 0
+
+    def attach(self, state: State) -> None:
+        """
+        Starts collecting the decision latency and delivered people's times of
+        a state. Undo with detach().
+        """
+        self._logic = state.logic
+        self._state = state
+        latencies = self.latencies
+        logic = state.logic
+        def timed_logic(view: dict):
+            start = time.perf_counter()
+            actions = logic(view)
+            latencies.append(time.perf_counter() - start)
+            return actions
+        state.logic = timed_logic
+        state.wait_log = self.waits
+        self._last_time = state.time
+
+    def detach(self) -> None:
+        """
+        Restores the state's move logic and stops collecting statistics.
+        """
+        self._state.logic = self._logic
+        self._state.wait_log = None
+
+    def render(self, state: State, force: bool = False) -> bool:
+        """
+        Draws a frame if enough time passed since the last one.
+
+        Args:
+            state: the state to draw
+            force: draw even if the frame rate would be exceeded
+        Returns:
+            whether a frame was drawn
+        """
+        now = time.perf_counter()
+        elapsed = now - self._last_frame
+        if elapsed < self.frame_s and not force:
+            return False
+        ticks_per_s = (state.time - self._last_time) / elapsed if elapsed != float('inf') else 0
+        self._last_frame = now
+        self._last_time = state.time
+        lines = self._build(state, ticks_per_s)
+        out = ['\x1b[2J'] if len(self._lines) == 0 else []
+        for row, line in enumerate(lines):
+            if row >= len(self._lines) or self._lines[row] != line:
+                out.append(f'\x1b[{row + 1};1H{line}\x1b[K')
+        for row in range(len(lines), len(self._lines)):
+            out.append(f'\x1b[{row + 1};1H\x1b[K')
+        out.append(f'\x1b[{len(lines) + 1};1H')
+        self.stream.write(''.join(out))
+        self.stream.flush()
+        self._lines = lines
+        return True
+
+    def _build(self, state: State, ticks_per_s: float) -> list[str]:
+        calls = state.hall_calls()
+        lines = []
+        for floor in reversed(range(state.n_floors)):
+            up = '↑' if calls[floor].up else ' '
+            dn = '↓' if calls[floor].dn else ' '
+            cars = ' '.join(f'[E{i} {len(elevator.ppl):2d}]'
+                            for i, elevator in enumerate(state.elevators) if elevator.loc == floor)
+            lines.append(f'floor {floor:02d} {up}{dn} | {len(state.floors[floor]):3d} waiting | {cars}')
+        lines.append('-' * 58)
+        for i, elevator in enumerate(state.elevators):
+            lines.append(f'elevator {i} @ floor {elevator.loc:02d} → {lstr(elevator.destinations())}')
+        lines.append('-' * 58)
+        lines.append(f'time = {state.time}, arrived = {state.total_ppl}, active = {state.n_active}, '
+                     f'{ticks_per_s:,.0f} ticks/s')
+        latencies = sorted(self.latencies)
+        waits = sorted(self.waits)
+        lines.append('decision latency  ' + self._percentiles([l * 1e6 for l in latencies], 'us'))
+        lines.append('delivered time    ' + self._percentiles(waits, 't'))
+        return lines
+
+    @staticmethod
+    def _percentiles(values: list[float], unit: str) -> str:
+        if len(values) == 0:
+            return '-'
+        def pick(q: float) -> float:
+            return values[min(len(values) - 1, int(q * len(values)))]
+        return f'p50 {pick(0.5):.1f}{unit}  p90 {pick(0.9):.1f}{unit}  p99 {pick(0.99):.1f}{unit}'
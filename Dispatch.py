@@ -0,0 +1,143 @@
+import Constants
+
+import numpy as np
+
+'''
+Group dispatch
+Instead of every car running its own sweep, hall calls are assigned to exactly
+one car each. An estimated-time-to-serve matrix (cars x call slots, slot 2f is
+floor f's up call and 2f+1 its down call) is kept between ticks, and a car's
+row is only recomputed when its position, direction or stops change. Every
+pending call goes to the car with the lowest estimate; the current owner gets
+a small bonus so that assignments do not flip-flop. Each car then serves its
+own destinations and assigned calls LOOK-style.
+'''
+
+class GroupDispatch:
+    """
+    Stateful group controller, use one instance per State.
+    """
+    def __init__(self, stop_penalty: float = 1.0, hysteresis: float = 0.5) -> None:
+        """
+        Args:
+            stop_penalty: estimated ticks lost per intermediate stop of a car
+            hysteresis: cost bonus that keeps a call with its current car
+        """
+        self.stop_penalty: float = stop_penalty
+        self.hysteresis: float = hysteresis
+        self.n_cars: int = 0
+        self.n_floors: int = 0
+
+    def _setup(self, n_cars: int, n_floors: int) -> None:
+        self.n_cars = n_cars
+        self.n_floors = n_floors
+        self._floors = np.arange(n_floors)
+        self.direction = np.zeros(n_cars, dtype=int)      # +1 up, -1 down, 0 idle
+        self.owner = np.full(2 * n_floors, -1, dtype=int)  # car assigned to each call slot
+        self.cost = np.zeros((n_cars, 2 * n_floors))
+        self._row_keys: list[tuple] = [None] * n_cars
+
+    def _update_row(self, car: int, loc: int, stops: list[int], v_max: int) -> None:
+        """
+        Recomputes a car's estimated time to serve every call slot if its
+        situation changed since the last tick.
+        """
+        direction = self.direction[car]
+        hi = max(stops + [loc])
+        lo = min(stops + [loc])
+        key = (loc, direction, hi, lo, len(stops))
+        if key == self._row_keys[car]:
+            return
+        self._row_keys[car] = key
+        f = self._floors
+        if direction > 0:
+            dist_up = np.where(f >= loc, f - loc, (hi - loc) + (hi - f))
+            top = np.maximum(hi, f)
+            dist_dn = (top - loc) + (top - f)
+        elif direction < 0:
+            dist_dn = np.where(f <= loc, loc - f, (loc - lo) + (f - lo))
+            bottom = np.minimum(lo, f)
+            dist_up = (loc - bottom) + (f - bottom)
+        else:
+            dist_up = dist_dn = np.abs(f - loc)
+        row = self.cost[car]
+        row[0::2] = dist_up / v_max
+        row[1::2] = dist_dn / v_max
+        row += self.stop_penalty * len(stops)
+
+    def __call__(self, view: dict) -> list[int|float]:
+        hall_calls = view['hall_calls']
+        n_floors = view['n_floors']
+        v_max = view['v_max']
+        cars = [view[f"E{i}"] for i in range(len(view) - 3)]
+        if len(cars) != self.n_cars or n_floors != self.n_floors \
+                or all(len(info['past']) == 0 for info in cars):    # new run
+            self._setup(len(cars), n_floors)
+
+        pending = np.zeros(2 * n_floors, dtype=bool)
+        for floor, call in enumerate(hall_calls):
+            pending[2 * floor] = call.up
+            pending[2 * floor + 1] = call.dn
+        self.owner[~pending] = -1
+
+        # refresh the cost rows, and keep a car that just opened for a call it
+        # could not take (e.g. full) from being assigned that call again
+        pressed = np.array([info['destinations'] for info in cars], dtype=bool)
+        dests = [np.flatnonzero(row).tolist() for row in pressed]
+        blocked = []
+        for i, info in enumerate(cars):
+            stops = dests[i] + [int(slot) // 2 for slot in np.flatnonzero(self.owner == i)]
+            self._update_row(i, info['location'], stops, v_max)
+            past = info['past']
+            if len(past) != 0 and isinstance(past[-1], float):
+                blocked.append((i, 2 * info['location'] + (past[-1] < 0)))
+
+        slots = np.flatnonzero(pending)
+        if len(slots) != 0:
+            cost = self.cost[:, slots].copy()
+            owned = self.owner[slots]
+            has_owner = owned >= 0
+            cost[owned[has_owner], np.flatnonzero(has_owner)] -= self.hysteresis
+            for car, slot in blocked:
+                cost[car, slots == slot] = np.inf
+            best = np.argmin(cost, axis=0)
+            self.owner[slots] = np.where(np.isinf(cost.min(axis=0)), -1, best)
+
+        # a busy car's action is ignored, so leave its direction as it is
+        return [0 if info['busy'] > 0 else self._act(i, info['location'], dests[i], n_floors, v_max)
+                for i, info in enumerate(cars)]
+
+    def _act(self, car: int, loc: int, dests: list[int], n_floors: int, v_max: int) -> int|float:
+        """
+        Picks the action of a single car from its destinations and assigned calls.
+        """
+        assigned = np.flatnonzero(self.owner == car)
+        call_up_here = 2 * loc in assigned
+        call_dn_here = 2 * loc + 1 in assigned
+        direction = self.direction[car]
+
+        if loc in dests or call_up_here or call_dn_here:
+            if call_up_here and (direction >= 0 or not call_dn_here):
+                open_up = True
+            elif call_dn_here:
+                open_up = False
+            else:
+                open_up = direction >= 0
+            if loc == 0:
+                open_up = True
+            elif loc == n_floors - 1:
+                open_up = False
+            self.direction[car] = 1 if open_up else -1
+            return Constants.OPEN_UP if open_up else Constants.OPEN_DOWN
+
+        targets = dests + [int(slot) // 2 for slot in assigned]
+        above = [t for t in targets if t > loc]
+        below = [t for t in targets if t < loc]
+        if direction >= 0 and len(above) != 0 or len(below) == 0 and len(above) != 0:
+            self.direction[car] = 1
+            return min(min(above) - loc, v_max)
+        elif len(below) != 0:
+            self.direction[car] = -1
+            return -min(loc - max(below), v_max)
+        self.direction[car] = 0
+        return 0
@@ -6,10 +6,75 @@ from ListUtils import list_subtract
 
 MAX_PEOPLE_DEFAULT = 20
 MAX_V_DEFAULT = 2
+
+def board_counts(loads: list[int], capacities: list[int], n_waiting: int) -> list[int]:
+    """
+    Splits n_waiting people over elevators as if each person in turn entered
+    the least filled elevator that still has room (the first one on ties),
+    without going person by person.
+
+    Args:
+        loads: the current number of passengers of each elevator
+        capacities: the passenger capacity of each elevator
+        n_waiting: the number of people who want to board
+    Returns:
+        the number of people boarding each elevator
+    """
+    # raise the fill level until the next level would need more people
+    level = min(loads)
+    top = max(capacities)
+    need = 0
+    while level < top:
+        next_need = sum(max(0, min(level + 1, cap) - load) for load, cap in zip(loads, capacities))
+        if next_need > n_waiting:
+            break
+        level += 1
+        need = next_need
+    counts = [max(0, min(level, cap) - load) for load, cap in zip(loads, capacities)]
+    # the rest go one each to the elevators sitting exactly at the level
+    extra = n_waiting - need
+    for i, (load, cap) in enumerate(zip(loads, capacities)):
+        if extra == 0:
+            break
+        if max(load, level) == level < cap:
+            counts[i] += 1
+            extra -= 1
+    return counts
+
+def board_counts_batch(loads, capacities, n_waiting):
+    """
+    Array version of board_counts() for many elevator groups at once, e.g.
+    every floor of many buildings.
+
+    Args:
+        loads: int array of shape (..., n_elevators)
+        capacities: int array broadcastable to loads
+        n_waiting: int array of shape (...)
+    Returns:
+        int array shaped like loads with the number of people boarding each elevator
+    """
+    import numpy as np
+    loads = np.asarray(loads)
+    capacities = np.broadcast_to(np.asarray(capacities), loads.shape)
+    n_waiting = np.asarray(n_waiting)
+    levels = np.arange(int(capacities.max()) + 1)
+    # need[..., L]: people needed to bring every elevator up to level L
+    need = np.clip(np.minimum(levels[:, None], capacities[..., None, :]) - loads[..., None, :],
+                   0, None).sum(axis=-1)
+    level = (need <= n_waiting[..., None]).sum(axis=-1) - 1
+    need = np.take_along_axis(need, level[..., None], axis=-1)[..., 0]
+    counts = np.clip(np.minimum(level[..., None], capacities) - loads, 0, None)
+    at_level = (np.maximum(loads, level[..., None]) == level[..., None]) & (level[..., None] < capacities)
+    rank = np.cumsum(at_level, axis=-1)
+    counts += at_level & (rank <= (n_waiting - need)[..., None])
+    return counts
+
 class Elevator:
     """
     Elevator container and logic.
     """
+    __slots__ = ('ppl', 'loc', 'max_v', 'max_ppl', 'past', 'max_floor', 'busy')
+
     def __init__(self,
                  max_floors: int = Constants.N_FLOORS,
                  v_max: int = MAX_V_DEFAULT,
@@ -27,24 +92,36 @@ class Elevator:
         self.max_ppl: int = max(1, ppl_max)  # passenger capacity
         self.past: list[float] = [] # a list of deltas to the elevator's loc, might be 0.5 or -0.5 for open doors
         self.max_floor: int = max_floors     # index of max floor
+        self.busy: int = 0                   # steps left before the elevator can act again
     
-    def add_people(self, people: list = None, lim: int = 1e3) -> list[Person]:
+    def reset(self) -> None:
+        """
+        Empties the elevator and returns it to floor 0.
+        """
+        self.ppl.clear()
+        self.past.clear()
+        self.loc = 0
+        self.busy = 0
+
+    def add_people(self, people: list = None, lim: int = None) -> int:
         """
-        Adds passengers to the elevator.
+        Adds passengers to the elevator, up to its capacity. The people board
+        in list order, so the caller can drop the first n from its queue.
 
         Args:
             people: a list of people to add
+            lim: the max number of people to add, unlimited if None
         Returns:
             the actual number of people added
         """
         if people is None:
             return 0
-        n_board = min(self.max_ppl - len(self.ppl), len(people), lim)
-        added = []
-        for person in people[:n_board+1]:
-            added.append(person)
-        self.ppl += added
-        return added
+        n_board = min(self.max_ppl - len(self.ppl), len(people))
+        if lim is not None:
+            n_board = min(n_board, lim)
+        n_board = max(0, n_board)
+        self.ppl += people[:n_board]
+        return n_board
     
     def valid_moves(self) -> set:
         """
@@ -68,10 +145,12 @@ class Elevator:
         return set(valid)
         
     
-    def release(self) -> float:
+    def release(self, waits: list = None) -> float:
         """
         ELevator releases the people who have arrived at their destination.
 
+        Args:
+            waits: if given, the total time of every released person is appended to it
         Returns:
             the cumulative cost of the people who left the elevator
         """
@@ -81,6 +160,8 @@ class Elevator:
             if person.dst == self.loc:
                 cost += person.cost()
                 removed.append(person)
+                if waits is not None:
+                    waits.append(person.time)
         self.ppl = list_subtract(self.ppl, removed)
         return cost
 
@@ -131,6 +212,16 @@ class Elevator:
         else:
             return set([person.dst for person in self.ppl])
 
+    def destination_bits(self) -> int:
+        """
+        Returns the pressed destination buttons packed into an int, with bit f
+        set if someone is going to floor f, see State.pack_floors().
+        """
+        bits = 0
+        for person in self.ppl:
+            bits |= 1 << person.dst
+        return bits
+
     def __str__(self) -> str:
         """
         Returns a string representation of the elevator.
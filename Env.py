@@ -0,0 +1,147 @@
+from Elevator import board_counts_batch
+from State import State
+import Constants
+
+import numpy as np
+
+def n_actions(v_max: int) -> int:
+    """
+    Returns the number of discrete actions per elevator: moves of -v_max to
+    v_max floors, then OPEN_UP and OPEN_DOWN.
+    """
+    return 2 * v_max + 3
+
+def decode_action(index: int, v_max: int) -> int|float:
+    """
+    Converts a discrete action index into a State action.
+    """
+    if index <= 2 * v_max:
+        return int(index) - v_max
+    return Constants.OPEN_UP if index == 2 * v_max + 1 else Constants.OPEN_DOWN
+
+class VecEnv:
+    """
+    A Gym-style vector environment over several States that share one
+    building layout. Observations are State.flat_view() rows of one float32
+    array, actions are discrete indices per elevator (see decode_action()),
+    and rewards are the step's change of total_cost(), negated, so the rewards
+    of an episode add up to minus its final cost. State keeps the waiting
+    people's costs as running sums, so this needs no pass over everyone.
+    The boarding of every environment is computed with one array call per
+    step. Finished episodes are reset automatically.
+    """
+    def __init__(self,
+                 n_envs: int,
+                 max_steps: int = Constants.N_STEPS,
+                 floors: int = Constants.N_FLOORS,
+                 n_elevators: int = Constants.N_ELEVATORS,
+                 avg_ppl: float = Constants.AVG_PPL_PER_FLOOR_TICK,
+                 **state_args) -> None:
+        """
+        Args:
+            n_envs: the number of parallel environments
+            max_steps: the episode length
+            floors, n_elevators, avg_ppl, state_args: forwarded to State()
+        """
+        self.n_envs: int = n_envs
+        self.max_steps: int = max_steps
+        self.states: list[State] = [State(floors=floors,
+                                          n_elevators=n_elevators,
+                                          avg_ppl=avg_ppl,
+                                          **state_args)
+                                    for _ in range(n_envs)]
+        self.v_max: int = self.states[0].elevators[0].max_v
+        self.n_actions: int = n_actions(self.v_max)
+        self.obs_size: int = self.states[0].flat_view_size()
+        self._obs = np.zeros((n_envs, self.obs_size), dtype=np.float32)
+        self._cost = np.zeros(n_envs)
+        self._steps = np.zeros(n_envs, dtype=int)
+
+    def reset(self, seed: int = None) -> np.ndarray:
+        """
+        Resets every environment.
+
+        Args:
+            seed: see State.reset()
+        Returns:
+            the observations, shape (n_envs, obs_size)
+        """
+        for i, state in enumerate(self.states):
+            self._reset_one(i, seed=seed if seed is None or i == 0 else None)
+        return self._obs.copy()
+
+    def _reset_one(self, i: int, seed: int = None) -> None:
+        state = self.states[i]
+        state.reset(seed)
+        self._cost[i] = state.total_cost()
+        self._steps[i] = 0
+        state.flat_view(out=self._obs[i])
+
+    def step(self, actions) -> tuple[np.ndarray, np.ndarray, np.ndarray, dict]:
+        """
+        Advances every environment by one step.
+
+        Args:
+            actions: int array of shape (n_envs, n_elevators) with action indices
+        Returns:
+            (observations, rewards, dones, info). The observation of a finished
+            environment is already the first one of its next episode; info
+            holds 'episode_cost' (the final total_cost(), NaN if not done).
+        """
+        actions = np.asarray(actions)
+        rewards = np.zeros(self.n_envs, dtype=np.float64)
+        dones = np.zeros(self.n_envs, dtype=bool)
+        episode_cost = np.full(self.n_envs, np.nan)
+        top = self.states[0].n_floors - 1
+        steps = []
+        for i, state in enumerate(self.states):
+            decoded = []
+            for elevator, index in zip(state.elevators, actions[i].tolist()):
+                action = decode_action(index, self.v_max)
+                if isinstance(action, int):
+                    # stay inside the building
+                    action = min(max(action, -elevator.loc), top - elevator.loc)
+                decoded.append(action)
+            steps.append(state.begin_update(actions=decoded))
+        counts = self._board_counts(steps)
+        for i, state in enumerate(self.states):
+            state.end_update(steps[i], counts[i])
+            cost = state.total_cost()
+            rewards[i] = self._cost[i] - cost
+            self._cost[i] = cost
+            self._steps[i] += 1
+            if self._steps[i] >= self.max_steps:
+                dones[i] = True
+                episode_cost[i] = cost
+                self._reset_one(i)
+            else:
+                state.flat_view(out=self._obs[i])
+        return self._obs.copy(), rewards, dones, {'episode_cost': episode_cost}
+
+    def _board_counts(self, steps: list) -> list[list[list[int]]]:
+        """
+        Splits the waiting people over the open elevators of every floor of
+        every environment with one board_counts_batch() call.
+
+        Args:
+            steps: the State.begin_update() result of each environment
+        Returns:
+            the counts to pass to each environment's State.end_update()
+        """
+        counts = [[[] for _ in step.boarding] for step in steps]
+        groups = [(i, j) for i, step in enumerate(steps)
+                  for j, (_, elevators, ppl) in enumerate(step.boarding) if elevators and ppl]
+        if len(groups) == 0:
+            return counts
+        # unused columns are cars with no room, which never get anyone
+        loads = np.zeros((len(groups), len(self.states[0].elevators)), dtype=int)
+        capacities = np.zeros_like(loads)
+        n_waiting = np.zeros(len(groups), dtype=int)
+        for g, (i, j) in enumerate(groups):
+            _, elevators, ppl = steps[i].boarding[j]
+            loads[g, :len(elevators)] = [len(e.ppl) for e in elevators]
+            capacities[g, :len(elevators)] = [e.max_ppl for e in elevators]
+            n_waiting[g] = len(ppl)
+        for (i, j), row in zip(groups, board_counts_batch(loads, capacities, n_waiting).tolist()):
+            counts[i][j] = row[:len(steps[i].boarding[j][1])]
+        return counts
@@ -301,4 +301,12 @@ def c_look(view: dict) -> list[int|float]:
             new_act = look_helper(location=loc_index, highest_floor=n_floors-1, destinations=dests, 
                                   outside_calls=hall_calls, prev_action=past[-1], v_max=elevator_v)
             actions.append(new_act)
-    return actions
\ No newline at end of file
+    return actions
+
+
+def __getattr__(name: str):
+    # GroupDispatch needs NumPy, so it is only imported when asked for
+    if name == 'GroupDispatch':
+        from Dispatch import GroupDispatch
+        return GroupDispatch
+    raise AttributeError(f"module 'Models' has no attribute '{name}'")
@@ -3,7 +3,10 @@ from random import randint
 class Person:
     """
     A single person, with a running timer, a source, and a destination.
+    Slotted, since a busy simulated day creates hundreds of thousands of these.
     """
+    __slots__ = ('src', 'dst', 'time')
+
     def __init__(self, src: int = 0, dest: int = 1, time: int = 0) -> None:
         """
         Create a person with a destination.
@@ -28,12 +31,25 @@ class Person:
             src: where the person is being generated
             floor_range: a range for the person's prospective destinations
         """
+        return cls(src, cls.random_dst(src, dst_range))
+
+    @staticmethod
+    def random_dst(src: int = 0, dst_range: tuple = None) -> int:
+        """
+        Randomly picks a destination in dst_range which is not src.
+
+        Args:
+            src: where the person is being generated
+            dst_range: a range for the person's prospective destinations
+        Returns:
+            the destination floor
+        """
         if dst_range is None:
             dst_range = (0, 1)
         dest = src
         while dest == src:  # cannot start and end on the same floor
             dest = randint(dst_range[0], dst_range[1])
-        return cls(src, dest)
+        return dest
 
     def cost(self) -> float:
         """
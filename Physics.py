@@ -0,0 +1,85 @@
+import math
+
+FLOOR_HEIGHT_DEFAULT = 3.5  # m
+V_MAX_DEFAULT = 2.5         # m/s
+A_MAX_DEFAULT = 1.0         # m/s^2
+JERK_DEFAULT = 1.5          # m/s^3
+DOOR_TIME_DEFAULT = 4.0     # s to open and close the doors
+BOARD_TIME_DEFAULT = 1.2    # s per person entering or leaving
+TICK_DEFAULT = 2.0          # s of simulated time per State.update()
+
+def travel_time(distance: float, v_max: float, a_max: float, jerk: float) -> float:
+    """
+    Time of a jerk-limited (S-curve) trip that starts and ends at rest.
+
+    Args:
+        distance: the trip length in m
+        v_max: the speed limit in m/s
+        a_max: the acceleration limit in m/s^2
+        jerk: the jerk limit in m/s^3
+    Returns:
+        the trip time in s
+    """
+    if distance <= 0:
+        return 0.0
+    a = min(a_max, math.sqrt(v_max * jerk))     # peak acceleration reachable before v_max
+    if distance >= v_max * (v_max / a + a / jerk):
+        return distance / v_max + v_max / a + a / jerk  # cruises at v_max
+    # solve distance = v * (v / a + a / jerk) for the peak speed v
+    v_peak = a / 2 * (-a / jerk + math.sqrt((a / jerk) ** 2 + 4 * distance / a))
+    if v_peak >= a * a / jerk:
+        return distance / v_peak + v_peak / a + a / jerk
+    # too short to reach a_max, the trip is four equal jerk phases
+    return 4 * (distance / (2 * jerk)) ** (1 / 3)
+
+class Physics:
+    """
+    Travel and door timing for a building, converted to whole ticks. The
+    floor-to-floor travel table is computed once, so the simulation only
+    does lookups.
+    """
+    def __init__(self,
+                 n_floors: int,
+                 floor_heights: list[float] = None,
+                 v_max: float = V_MAX_DEFAULT,
+                 a_max: float = A_MAX_DEFAULT,
+                 jerk: float = JERK_DEFAULT,
+                 door_time: float = DOOR_TIME_DEFAULT,
+                 board_time: float = BOARD_TIME_DEFAULT,
+                 tick_s: float = TICK_DEFAULT) -> None:
+        """
+        Args:
+            n_floors: the number of floors in the building
+            floor_heights: the height of each floor in m, defaults to FLOOR_HEIGHT_DEFAULT
+            v_max, a_max, jerk: the cars' motion limits in m/s, m/s^2 and m/s^3
+            door_time: the time to open and close the doors in s
+            board_time: the time per person entering or leaving in s
+            tick_s: the simulated time per tick in s
+        """
+        if floor_heights is None:
+            floor_heights = [FLOOR_HEIGHT_DEFAULT] * n_floors
+        if len(floor_heights) != n_floors:
+            raise ValueError("Need one height per floor")
+        self.n_floors: int = n_floors
+        self.door_time: float = door_time
+        self.board_time: float = board_time
+        self.tick_s: float = tick_s
+        levels = [0.0]
+        for height in floor_heights[:-1]:
+            levels.append(levels[-1] + height)
+        # travel_s[src][dst]: seconds from floor src to floor dst
+        self.travel_s: list[list[float]] = [[travel_time(abs(b - a), v_max, a_max, jerk)
+                                             for b in levels] for a in levels]
+        # travel_ticks[src][dst]: whole ticks the car is busy, at least 1
+        self.travel_ticks: list[list[int]] = [[self._to_ticks(t) for t in row]
+                                              for row in self.travel_s]
+
+    def _to_ticks(self, seconds: float) -> int:
+        return max(1, math.ceil(seconds / self.tick_s - 1e-9))
+
+    def dwell_ticks(self, n_moved: int) -> int:
+        """
+        Returns the number of ticks a car stays at a floor when it opens its
+        doors and n_moved people get on or off.
+        """
+        return self._to_ticks(self.door_time + self.board_time * n_moved)
@@ -0,0 +1,97 @@
+import numpy as np
+from multiprocessing import shared_memory
+from typing import NamedTuple
+
+# columns of a results array, one row per run
+RESULT_FIELDS = ('total cost', 'people arrived', 'people left over', 'time elapsed')
+
+class ArraySpec(NamedTuple):
+    """
+    Everything a worker needs to attach to a SharedArray. Cheap to pickle.
+    """
+    name: str
+    shape: tuple
+    dtype: str
+
+class SharedArray:
+    """
+    A NumPy array backed by multiprocessing.shared_memory, so that workers can
+    read and write it without copying or pickling its contents. The process
+    that creates it must also unlink() it.
+    """
+    def __init__(self, shm: shared_memory.SharedMemory, shape: tuple, dtype: str, owner: bool) -> None:
+        self.shm: shared_memory.SharedMemory = shm
+        self.array: np.ndarray = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        self.spec: ArraySpec = ArraySpec(shm.name, tuple(shape), np.dtype(dtype).str)
+        self.owner: bool = owner
+
+    @classmethod
+    def create(cls, shape: tuple, dtype: str = 'float64', fill: float = 0):
+        """
+        Allocates a new shared array.
+        """
+        size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        shared = cls(shared_memory.SharedMemory(create=True, size=size), shape, dtype, owner=True)
+        shared.array.fill(fill)
+        return shared
+
+    @classmethod
+    def from_array(cls, array: np.ndarray):
+        """
+        Copies an existing array into a new shared array.
+        """
+        shared = cls.create(array.shape, array.dtype.str)
+        shared.array[...] = array
+        return shared
+
+    @classmethod
+    def attach(cls, spec: ArraySpec):
+        """
+        Maps a shared array created by another process.
+        """
+        return cls(shared_memory.SharedMemory(name=spec.name), spec.shape, spec.dtype, owner=False)
+
+    def close(self) -> None:
+        """
+        Unmaps the array from this process, and frees it if this process
+        created it.
+        """
+        del self.array
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+class Trace(NamedTuple):
+    """
+    The arrivals of several runs in compressed sparse rows: the (src, dst)
+    pairs of step t of run r are pairs[offsets[r*n_steps + t] : offsets[r*n_steps + t + 1]].
+    """
+    offsets: np.ndarray     # int64, n_runs * n_steps + 1
+    pairs: np.ndarray       # int32, n_arrivals x 2
+
+def pack_trace(runs: list[list[list[tuple[int, int]]]]) -> Trace:
+    """
+    Packs per-run, per-step arrival lists (see State.sample_arrivals()) into
+    a Trace. Every run must have the same number of steps.
+    """
+    steps = [step for run in runs for step in run]
+    offsets = np.zeros(len(steps) + 1, dtype=np.int64)
+    np.cumsum([len(step) for step in steps], out=offsets[1:])
+    pairs = np.array([pair for step in steps for pair in step], dtype=np.int32).reshape(-1, 2)
+    return Trace(offsets, pairs)
+
+def unpack_run(trace: Trace, run: int, n_steps: int) -> list[list[tuple[int, int]]]:
+    """
+    Rebuilds the per-step arrival lists of a single run, in the format
+    State.update() takes.
+    """
+    bounds = trace.offsets[run * n_steps:(run + 1) * n_steps + 1].tolist()
+    pairs = list(map(tuple, trace.pairs[bounds[0]:bounds[-1]].tolist()))
+    start = bounds[0]
+    return [pairs[lo - start:hi - start] for lo, hi in zip(bounds, bounds[1:])]
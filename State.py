@@ -1,23 +1,111 @@
-from Elevator import Elevator
+from Elevator import Elevator, board_counts
 from Person import Person
 import Constants
 from Vis import pretty_list as lstr
-import Models
-from ListUtils import list_subtract
+from Physics import Physics
 
+import copy
 import math
-from typing import NamedTuple
+import random
+from itertools import chain
+from typing import Iterator, NamedTuple
 
 class FloorCalls(NamedTuple):
     up: bool
     dn: bool
 
-from colorama import init as colorama_init
-from colorama import Fore
-from colorama import Style
+class StepBoarding(NamedTuple):
+    """
+    The boarding left to do in a step, see State.begin_update().
+    """
+    opened: list        # (elevator, riders before release, riders after release)
+    boarding: list      # (floor, open elevators, people going their way)
+
+def pack_calls(calls: list[FloorCalls]) -> int:
+    """
+    Packs hall calls into a single int. Bit 2f is floor f's up button and bit
+    2f+1 is its down button.
+    """
+    bits = 0
+    for floor, call in enumerate(calls):
+        bits |= (call.up << (2 * floor)) | (call.dn << (2 * floor + 1))
+    return bits
+
+def unpack_calls(bits: int, n_floors: int) -> list[FloorCalls]:
+    """
+    Inverse of pack_calls().
+    """
+    return [FloorCalls(bool(bits >> (2 * floor) & 1), bool(bits >> (2 * floor + 1) & 1))
+            for floor in range(n_floors)]
+
+def pack_floors(pressed: list[bool]) -> int:
+    """
+    Packs one button per floor, e.g. an elevator's destinations, into a
+    single int. Bit f is floor f's button.
+    """
+    bits = 0
+    for floor, button in enumerate(pressed):
+        bits |= button << floor
+    return bits
+
+def unpack_floors(bits: int, n_floors: int) -> list[bool]:
+    """
+    Inverse of pack_floors().
+    """
+    return [bool(bits >> floor & 1) for floor in range(n_floors)]
 
-import numpy as np
-from numpy.random import poisson
+# buildings taller than this compute the people potential with NumPy, smaller
+# ones stay in pure Python so that headless runs do not have to import it
+NUMPY_CONVOLVE_MIN_FLOORS = 16
+
+_colorama_initialized = False
+
+def _colorama_init_once() -> None:
+    # colorama is only needed for rendering, so it is imported on first use.
+    # It wraps stdout on every init, so repeated calls would nest the wrappers.
+    global _colorama_initialized
+    if not _colorama_initialized:
+        from colorama import init as colorama_init
+        colorama_init()
+        _colorama_initialized = True
+
+def poisson(lam: float) -> int:
+    """
+    Draws a Poisson distributed count with Knuth's multiplication method,
+    using the random module so that the simulation does not need NumPy.
+    Large rates are split into chunks to keep exp(-lam) representable.
+
+    Args:
+        lam: the average count
+    Returns:
+        the count
+    """
+    count = 0
+    while lam > 0:
+        chunk = min(lam, 30.0)
+        lam -= chunk
+        threshold = math.exp(-chunk)
+        p = random.random()
+        while p > threshold:
+            count += 1
+            p *= random.random()
+    return count
+
+def convolve_same(a: list[float], v: list[float]) -> list[float]:
+    """
+    Same as numpy.convolve(a, v, mode='same'), skipping the zeros of a since
+    most floors are usually empty.
+    """
+    n, m = len(a), len(v)
+    offset = (min(n, m) - 1) // 2
+    size = max(n, m)
+    out = [0.0] * size
+    for j, count in enumerate(a):
+        if count:
+            shift = offset - j
+            for i in range(max(0, -shift), min(size, m - shift)):
+                out[i] += count * v[i + shift]
+    return out
 
 class State:
     """
@@ -34,7 +122,8 @@ class State:
                  floors: int = 2,
                  n_elevators: int = 1, 
                  avg_ppl: float = 0,
-                 ppl_generation_profile: list[float] = None) -> None:
+                 ppl_generation_profile: list[float] = None,
+                 physics: Physics = None) -> None:
         """
         Create a new state for an elevator optimization problem. 
 
@@ -45,6 +134,7 @@ class State:
             avg_ppl: the average number of people that will arrive on each floor per step
             ppl_generation_profile: average number of people to generate on each floor per step, specified for each floor.
                                     Overrides the avg_ppl parameter.
+            physics: travel and door timing. If None, every action takes exactly one step.
         """
         if n_elevators < 1 or floors < 2 or avg_ppl < 0:
             raise ValueError("Not a realistic situation")
@@ -55,9 +145,14 @@ class State:
         self.logic: function = logic
         self.time: int = 0
         self.total_ppl: int = 0
+        self.n_active: int = 0  # number of people waiting or riding, kept live
+        self.active_time: int = 0       # sum of the active people's times, kept live
+        self.active_cost: int = 0       # sum of the active people's costs (time^2), kept live
         self.waiting_cost: float = 0
         self.distribution_cost: float = 0
         self.avg_ppl: float = avg_ppl
+        self.physics: Physics = physics
+        self.wait_log: list[int] = None  # if set, the times of delivered people are appended to it
         # the average number of people to arrive on each floor per tick
         # people are drawn according to a poisson distribution
         self.arrival_profile: list[float] = [self.avg_ppl for _ in range(self.n_floors)] \
@@ -70,9 +165,34 @@ class State:
         self.conv_array = list(reversed(self.conv_array)) + self.conv_array
         if self.n_floors % 2 == 1:
             self.conv_array.insert(_half_len-1, self.conv_array[_half_len-1]-1)
-        colorama_init()
     
-    def update(self, add_ppl: bool = True) -> None:
+    def reset(self, seed: int = None) -> None:
+        """
+        Returns the state to an empty building with all elevators on floor 0,
+        reusing its existing objects, so that one State can serve many runs.
+
+        Args:
+            seed: if given, seeds the random number generators used for
+                  arrivals
+        """
+        if seed is not None:
+            random.seed(seed)
+        for elevator in self.elevators:
+            elevator.reset()
+        for ppl in self.floors:
+            ppl.clear()
+        self.time = 0
+        self.total_ppl = 0
+        self.n_active = 0
+        self.active_time = 0
+        self.active_cost = 0
+        self.waiting_cost = 0
+        self.distribution_cost = 0
+
+    def update(self,
+               add_ppl: bool = True,
+               arrivals: list[tuple[int, int]] = None,
+               actions: list[int|float] = None) -> None:
         """
         Forwards the time by 1 step. It 
         1. updates all the times for the Person objects,
@@ -84,23 +204,61 @@ class State:
 
         Args:
             add_ppl: whether or not to add people
+            arrivals: (src, dst) pairs to add instead of sampling new ones,
+                      see sample_arrivals()
+            actions: the elevators' actions for this step. If None, they come
+                     from the move logic.
+        """
+        step = self.begin_update(add_ppl, arrivals, actions)
+        counts = [board_counts([len(e.ppl) for e in elevators], [e.max_ppl for e in elevators], len(ppl))
+                  if elevators and ppl else []
+                  for _, elevators, ppl in step.boarding]
+        self.end_update(step, counts)
+
+    def begin_update(self,
+                     add_ppl: bool = True,
+                     arrivals: list[tuple[int, int]] = None,
+                     actions: list[int|float] = None) -> 'StepBoarding':
+        """
+        The first half of update(): everything up to the people boarding the
+        opened elevators. Callers that step many states at once can compute
+        the boarding counts of all of them together, e.g. with
+        Elevator.board_counts_batch(), and then call end_update() on each.
+
+        Args:
+            see update()
+        Returns:
+            the boarding still to do, to be passed to end_update()
         """
         self.time += 1
         for person in self.active_ppl():
             person.time += 1
+        # every active (t+1)^2 grows by 2t+1
+        self.active_cost += 2 * self.active_time + self.n_active
+        self.active_time += self.n_active
         if add_ppl:
-            self.add_ppl()
-        actions = self.logic(self.sys_view())
+            self.add_ppl(arrivals)
+        actions = list(self.logic(self.sys_view()) if actions is None else actions)
         # first iterate over the elevators that need to move
         # then iterate over the floors to better distribute people
         cost_distribution = self.hall_ppl_potential()
-        for action, elevator in zip(actions, self.elevators):
+        for i, (action, elevator) in enumerate(zip(actions, self.elevators)):
             self.distribution_cost += cost_distribution[elevator.loc]
-            if isinstance(action, int):
+            if elevator.busy > 0:
+                # still travelling or dwelling, the action is ignored
+                elevator.busy -= 1
+                actions[i] = None
+            elif isinstance(action, int):
+                # stay inside the building
+                action = min(max(action, -elevator.loc), self.n_floors - 1 - elevator.loc)
+                if self.physics is not None:
+                    elevator.busy = self.physics.travel_ticks[elevator.loc][elevator.loc + action] - 1
                 elevator.move_delta(action)
             else:
                 elevator.past.append(action)
         
+        opened = []     # (elevator, riders before release, riders after release)
+        boarding = []   # (floor, open elevators, people going their way)
         for floor, ppl in enumerate(self.floors):
             # people will automatically board the elevator with least passengers
             if len(ppl) == 0 and not self._is_elevator_on_floor(floor):
@@ -110,32 +268,50 @@ class State:
             ppl_up = [p for p in ppl if p.dst > floor]
             ppl_down = [p for p in ppl if p.dst < floor]
             for action, elevator in zip(actions, self.elevators):
-                if elevator.loc == floor and (math.isclose(action, Constants.OPEN_UP) or math.isclose(action, Constants.OPEN_DOWN)):
-                    self.waiting_cost += elevator.release()
+                if action is not None and elevator.loc == floor and (math.isclose(action, Constants.OPEN_UP) or math.isclose(action, Constants.OPEN_DOWN)):
+                    n_riding = len(elevator.ppl)
+                    released = []
+                    cost = elevator.release(released)
+                    self.waiting_cost += cost
+                    self.active_cost -= cost
+                    self.active_time -= sum(released)
+                    self.n_active -= n_riding - len(elevator.ppl)
+                    if self.wait_log is not None:
+                        self.wait_log.extend(released)
+                    opened.append((elevator, n_riding, len(elevator.ppl)))
                     if action == Constants.OPEN_UP:
                         open_up.append(elevator)
                     elif action == Constants.OPEN_DOWN:
                         open_down.append(elevator)
-            ppl_up = State._distribute_ppl(open_up, ppl_up)
-            ppl_down = State._distribute_ppl(open_down, ppl_down)
-            self.floors[floor] = sorted(ppl_up + ppl_down, key=lambda p: p.time)
-
-    @staticmethod  
-    def _distribute_ppl(elevators: list[Elevator], people: list[Person]) -> list[Person]:
-        added = []
-        if len(elevators) > 1:
-            for _ in people:
-            # people enter the elevator with the least passengers
-                least_filled = min(elevators, key=lambda e: len(e.ppl))
-                added = least_filled.add_people(people=people, lim=1)
-                if len(added) == 0:
-                    break   # all elevators are full
-            return list_subtract(people, added)
-        elif len(elevators) == 1:
-            added = elevators[0].add_people(people=people)
-            return list_subtract(people, added)
-        else:
-            return people
+            boarding.append((floor, open_up, ppl_up))
+            boarding.append((floor, open_down, ppl_down))
+        return StepBoarding(opened, boarding)
+
+    def end_update(self, step: 'StepBoarding', counts: list[list[int]]) -> None:
+        """
+        The second half of update(): boards the people and starts the door
+        dwell times.
+
+        Args:
+            step: the result of begin_update()
+            counts: for each entry of step.boarding, the number of people
+                    boarding each of its elevators, see Elevator.board_counts()
+        """
+        left = {}
+        for (floor, elevators, ppl), floor_counts in zip(step.boarding, counts):
+            n_boarded = 0
+            # people enter the elevator with the least passengers, in queue order
+            for elevator, count in zip(elevators, floor_counts):
+                n_boarded += elevator.add_people(ppl[n_boarded:n_boarded + count])
+            left.setdefault(floor, []).extend(ppl[n_boarded:])
+        for floor, ppl in left.items():
+            self.floors[floor] = sorted(ppl, key=lambda p: p.time)
+
+        if self.physics is not None:
+            for elevator, n_riding, n_stayed in step.opened:
+                # everyone who got off plus everyone who got on
+                n_moved = (n_riding - n_stayed) + (len(elevator.ppl) - n_stayed)
+                elevator.busy = self.physics.dwell_ticks(n_moved) - 1
     
     def _is_elevator_on_floor(self, floor: int):
         for elevator in self.elevators:
@@ -163,17 +339,55 @@ class State:
         """
         view = {}
         for i, elevator in enumerate(self.elevators):
-            dests = elevator.destinations()
-            destination_vector = [(floor in dests) 
-                                  for floor in range(self.n_floors)]
+            destination_vector = unpack_floors(elevator.destination_bits(), self.n_floors)
             view.update({f'E{i}' : {'destinations' : destination_vector, 
                                     'location' : elevator.loc,
-                                    'past' : elevator.past}})
+                                    'past' : elevator.past,
+                                    'busy' : elevator.busy}})
         view.update({'hall_calls': self.hall_calls()})
         view.update({'n_floors': self.n_floors})
         view.update({'v_max': self.elevators[0].max_v})
         return view
     
+    def flat_view(self, out = None):
+        """
+        Encodes sys_view() as a fixed-size float32 vector, e.g. for learned
+        controllers. For every elevator: its location and last action scaled
+        to [-1, 1], its busy steps, and one 0/1 entry per destination floor.
+        Then one 0/1 entry per floor for the up calls and one for the down calls.
+
+        Args:
+            out: a float32 array of size flat_view_size() to write into, a new
+                 one is allocated if None
+        Returns:
+            the encoded view
+        """
+        import numpy as np
+        n = self.n_floors
+        if out is None:
+            out = np.zeros(self.flat_view_size(), dtype=np.float32)
+        else:
+            out.fill(0)
+        i = 0
+        for elevator in self.elevators:
+            out[i] = elevator.loc / (n - 1)
+            if len(elevator.past) != 0:
+                out[i + 1] = elevator.past[-1] / elevator.max_v
+            out[i + 2] = elevator.busy
+            for person in elevator.ppl:
+                out[i + 3 + person.dst] = 1
+            i += n + 3
+        for floor, ppl in enumerate(self.floors):
+            for person in ppl:
+                out[i + floor + (person.dst < floor) * n] = 1
+        return out
+
+    def flat_view_size(self) -> int:
+        """
+        Returns the length of flat_view().
+        """
+        return len(self.elevators) * (self.n_floors + 3) + 2 * self.n_floors
+
     def total_cost(self) -> float:
         """
         Calculates the cumulative cost of all the people still waiting to be
@@ -187,50 +401,106 @@ class State:
             the cumulative cost of the state
         """
         if self.total_ppl > 0:
-            avg_completion = self.total_ppl - len(self.active_ppl())
+            avg_completion = self.total_ppl - self.n_active
             for elevator in self.elevators:
                 for person in elevator.ppl:
                     avg_completion += abs((elevator.loc - person.dst) / (person.src - person.dst))
             avg_completion /= self.total_ppl
-            for person in self.active_ppl():
-                self.waiting_cost += person.cost()
-            return self.waiting_cost / self.total_ppl * self.WAITING_COST_WEIGHT \
+            waiting_cost = self.waiting_cost + self.active_cost
+            return waiting_cost / self.total_ppl * self.WAITING_COST_WEIGHT \
                 + (1 - avg_completion) * self.COMPLETION_COST_WEIGHT \
-                + self.distribution_cost / self.time * self.DISTRIBUTION_COST_WEIGHT
+                + self.distribution_cost / max(self.time, 1) * self.DISTRIBUTION_COST_WEIGHT
         elif self.time > 0:
             # basically return to ground floor
             return self.distribution_cost / self.time * self.DISTRIBUTION_COST_WEIGHT
         else:
             return 0.0
     
-    def active_ppl(self) -> list[Person]:
+    def active_ppl(self) -> Iterator[Person]:
         """
-        Returns a list of all the people still being tracked by this State.
+        Returns a lazy view of all the people still being tracked by this State.
+        Use n_active for the count.
 
         Returns:
-            the aforementioned list
+            an iterator over the aforementioned people
         """
-        return self.hall_ppl() + self.elevator_ppl()
+        return chain(self.hall_ppl(), self.elevator_ppl())
     
-    def add_ppl(self) -> None:
-        for floor, ppl in enumerate(self.floors):
-            for _ in range(poisson(lam=self.arrival_profile[floor], size=1)[0]):
-                self.total_ppl += 1
-                ppl.append(Person.from_range(src=floor, dst_range=(0, self.n_floors-1)))
+    def add_ppl(self, arrivals: list[tuple[int, int]] = None) -> None:
+        """
+        Adds newly arrived people to the floors.
+
+        Args:
+            arrivals: (src, dst) pairs to add. If None, they are drawn with
+                      sample_arrivals().
+        """
+        if arrivals is None:
+            arrivals = self.sample_arrivals()
+        for src, dst in arrivals:
+            self.floors[src].append(Person(src, dst))
+        self.total_ppl += len(arrivals)
+        self.n_active += len(arrivals)
+
+    def sample_arrivals(self) -> list[tuple[int, int]]:
+        """
+        Draws one step's worth of arrivals from the arrival profile without
+        adding them to the state, so that the same arrivals can be fed to
+        several states.
+
+        Returns:
+            a list of (src, dst) pairs
+        """
+        arrivals = []
+        dst_range = (0, self.n_floors-1)
+        for floor in range(self.n_floors):
+            for _ in range(poisson(self.arrival_profile[floor])):
+                arrivals.append((floor, Person.random_dst(floor, dst_range)))
+        return arrivals
     
-    def hall_ppl(self) -> list[Person]:
-        people = []
-        for floor in self.floors:
-            for person in floor:
-                people.append(person)
-        return people
+    def hall_ppl(self) -> Iterator[Person]:
+        """
+        Returns a lazy view of the people waiting on the floors.
+        """
+        return chain.from_iterable(self.floors)
     
-    def elevator_ppl(self) -> list[Person]:
-        people = []
-        for elevator in self.elevators:
-            for person in elevator.ppl:
-                people.append(person)
-        return people
+    def elevator_ppl(self) -> Iterator[Person]:
+        """
+        Returns a lazy view of the people riding the elevators.
+        """
+        return chain.from_iterable(elevator.ppl for elevator in self.elevators)
+
+    def n_elevator_ppl(self) -> int:
+        """
+        Returns the number of people riding the elevators.
+        """
+        return sum(len(elevator.ppl) for elevator in self.elevators)
+
+    def n_hall_ppl(self) -> int:
+        """
+        Returns the number of people waiting on the floors.
+        """
+        return self.n_active - self.n_elevator_ppl()
+
+    def reset_accounting(self) -> None:
+        """
+        Restarts the cost accounting without touching the building, e.g. after
+        a warm-up. The people already in the building count as arrivals of the
+        new accounting window but keep their clocks: the cost they had built
+        up is subtracted, so each of them is only charged t_end^2 - t_warm^2,
+        the part of their wait that falls into the window.
+        """
+        self.time = 0
+        self.waiting_cost = -self.active_cost
+        self.distribution_cost = 0
+        self.total_ppl = self.n_active
+
+    def snapshot(self) -> 'State':
+        """
+        Returns an independent deep copy of this state, including its people,
+        elevators and move logic, so that several evaluations can start from
+        the same building.
+        """
+        return copy.deepcopy(self)
 
     def summarize(self) -> dict:
         """
@@ -243,7 +513,7 @@ class State:
         return {
             'time elapsed' : self.time,
             'people arrived' : self.total_ppl,
-            'people left over' : len(self.active_ppl()),
+            'people left over' : self.n_active,
             'total cost' : round(total_cost, 3),
             'average cost' : round(total_cost/self.total_ppl, 3) 
                             if self.total_ppl != 0 else 0
@@ -283,7 +553,11 @@ class State:
         hall_ppl_count = []
         for floor in self.floors:
             hall_ppl_count.append(len(floor))
-        cost_distribution = list(np.convolve(hall_ppl_count, self.conv_array, mode='same'))
+        if self.n_floors > NUMPY_CONVOLVE_MIN_FLOORS:
+            import numpy as np
+            cost_distribution = np.convolve(hall_ppl_count, self.conv_array, mode='same').tolist()
+        else:
+            cost_distribution = convolve_same(hall_ppl_count, self.conv_array)
         cost_distribution[0] -= 0.001   # make elevators return to ground floor
         return cost_distribution
     
@@ -291,6 +565,9 @@ class State:
         """
         Try printing it.
         """
+        from colorama import Fore
+        from colorama import Style
+        _colorama_init_once()
         calls = self.hall_calls()
         rep = '==========================================================\n\n'
         distribution_cost = self.hall_ppl_potential()
@@ -317,7 +594,48 @@ class State:
             rep += f'{Fore.CYAN}elevator {i} @ floor {elevator.loc:02d} {elevator_dest_str}{Style.RESET_ALL}| {lstr(elevator.ppl)}\n'
             rep += f"{Fore.CYAN}\tpast: {lstr(elevator.past)}{Style.RESET_ALL}\n\n"
         rep += "----------------------------------------------------------\n"
-        rep += f"time = {Fore.CYAN}{self.time}{Style.RESET_ALL}, cost = {self.total_cost():.3f}, active people = {len(self.active_ppl())}\n"
+        rep += f"time = {Fore.CYAN}{self.time}{Style.RESET_ALL}, cost = {self.total_cost():.3f}, active people = {self.n_active}\n"
         rep += f"elevator system sees {Fore.CYAN}blue{Style.RESET_ALL}\n"
         rep += "==========================================================\n"
-        return rep
\ No newline at end of file
+        return rep
+
+
+class StatePool:
+    """
+    A pool of reusable States with the same building, for batch drivers that
+    run many short simulations.
+    """
+    def __init__(self, **state_args) -> None:
+        """
+        Args:
+            state_args: forwarded to State() when the pool needs a new state
+        """
+        self.state_args: dict = state_args
+        self._free: list[State] = []
+
+    def acquire(self, logic = None, seed: int = None) -> State:
+        """
+        Hands out a reset state, constructing one only if the pool is empty.
+
+        Args:
+            logic: if given, replaces the state's move logic
+            seed: see State.reset()
+        Returns:
+            the state
+        """
+        if len(self._free) != 0:
+            state = self._free.pop()
+            state.reset(seed)
+        else:
+            if seed is not None:
+                random.seed(seed)
+            state = State(**self.state_args)
+        if logic is not None:
+            state.logic = logic
+        return state
+
+    def release(self, state: State) -> None:
+        """
+        Returns a state to the pool.
+        """
+        self._free.append(state)
@@ -0,0 +1,156 @@
+import numpy as np
+from typing import NamedTuple
+
+class Period(NamedTuple):
+    name: str
+    start: int          # first tick of the period, it lasts until the next one starts
+    rates: np.ndarray   # average number of people arriving on each floor per tick
+    od: np.ndarray      # origin/destination matrix, od[src][dst] is the chance that someone
+                        # arriving on src goes to dst. Rows sum to 1, the diagonal is 0.
+
+def uniform_od(n_floors: int) -> np.ndarray:
+    """
+    Returns an origin/destination matrix where every other floor is equally likely.
+    """
+    od = np.ones((n_floors, n_floors)) - np.eye(n_floors)
+    return od / od.sum(axis=1, keepdims=True)
+
+def lobby_od(n_floors: int, to_lobby: float, lobby: int = 0) -> np.ndarray:
+    """
+    Returns an origin/destination matrix where people on the other floors go to
+    the lobby with probability to_lobby, and uniformly elsewhere otherwise.
+    People arriving in the lobby go to any other floor uniformly.
+    """
+    od = uniform_od(n_floors)
+    if n_floors == 2:
+        return od   # the lobby is the only other floor
+    others = np.arange(n_floors) != lobby
+    od[others, lobby] = 0
+    od[others] *= (1 - to_lobby) / od[others].sum(axis=1, keepdims=True)
+    od[others, lobby] = to_lobby
+    return od
+
+class TrafficModel:
+    """
+    A time-varying arrival model made of consecutive periods, each with its own
+    per-floor arrival rates and origin/destination matrix. Whole days are
+    sampled at once with array operations, and the resulting arrivals can be
+    fed to State.update().
+    """
+    def __init__(self, n_floors: int, periods: list[Period], day_length: int) -> None:
+        """
+        Args:
+            n_floors: the number of floors in the building
+            periods: the periods, sorted by start tick, the first starting at 0
+            day_length: the number of ticks in a day
+        """
+        if len(periods) == 0 or periods[0].start != 0 \
+                or any(a.start >= b.start for a, b in zip(periods, periods[1:])) \
+                or periods[-1].start >= day_length:
+            raise ValueError("Periods must start at 0 and be strictly increasing")
+        for period in periods:
+            if period.rates.shape != (n_floors,) or period.od.shape != (n_floors, n_floors):
+                raise ValueError(f"Period '{period.name}' does not match {n_floors} floors")
+        self.n_floors: int = n_floors
+        self.periods: list[Period] = periods
+        self.day_length: int = day_length
+
+    @classmethod
+    def office_day(cls,
+                   n_floors: int,
+                   day_length: int = 500,
+                   avg_ppl: float = 0.1,
+                   lobby: int = 0):
+        """
+        An office building's day: a morning up-peak out of the lobby, quiet
+        inter-floor traffic, a two-way lunch peak, and an evening down-peak
+        back to the lobby.
+
+        Args:
+            n_floors: the number of floors in the building
+            day_length: the number of ticks in a day
+            avg_ppl: the inter-floor arrival rate per floor per tick, the
+                     peaks are scaled from it
+            lobby: the lobby floor
+        """
+        is_lobby = np.arange(n_floors) == lobby
+        n_upper = n_floors - 1
+        def rates(lobby_rate: float, floor_rate: float) -> np.ndarray:
+            return np.where(is_lobby, lobby_rate, floor_rate).astype(float)
+        periods = [
+            Period('up-peak', 0,
+                   rates(6 * avg_ppl * n_upper / 2, avg_ppl / 2), lobby_od(n_floors, 0.1, lobby)),
+            Period('inter-peak', int(0.2 * day_length),
+                   rates(avg_ppl, avg_ppl), uniform_od(n_floors)),
+            Period('lunch', int(0.45 * day_length),
+                   rates(2 * avg_ppl * n_upper / 2, 2 * avg_ppl), lobby_od(n_floors, 0.5, lobby)),
+            Period('inter-peak', int(0.55 * day_length),
+                   rates(avg_ppl, avg_ppl), uniform_od(n_floors)),
+            Period('down-peak', int(0.8 * day_length),
+                   rates(avg_ppl / 2, 3 * avg_ppl), lobby_od(n_floors, 0.9, lobby)),
+        ]
+        return cls(n_floors, periods, day_length)
+
+    def period_at(self, tick: int) -> Period:
+        """
+        Returns the period that a tick of the day falls into.
+        """
+        tick %= self.day_length
+        starts = [period.start for period in self.periods]
+        return self.periods[int(np.searchsorted(starts, tick, side='right')) - 1]
+
+    def sample(self,
+               n_ticks: int = None,
+               scale: float = 1.0,
+               rng: np.random.Generator = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Draws all the arrivals of n_ticks ticks at once, repeating the day if
+        needed.
+
+        Args:
+            n_ticks: the number of ticks to sample, defaults to one day
+            scale: multiplier on all the arrival rates, e.g. 10 for stress tests
+            rng: the random generator to use
+        Returns:
+            (tick, src, dst) arrays sorted by tick
+        """
+        if n_ticks is None:
+            n_ticks = self.day_length
+        if rng is None:
+            rng = np.random.default_rng()
+        n = self.n_floors
+        ticks, srcs, dsts = [], [], []
+        for day_start in range(0, n_ticks, self.day_length):
+            for i, period in enumerate(self.periods):
+                start = day_start + period.start
+                end = day_start + (self.periods[i+1].start if i+1 < len(self.periods) else self.day_length)
+                end = min(end, n_ticks)
+                if start >= end:
+                    break
+                counts = rng.poisson(period.rates * scale, size=(end - start, n))
+                slot = np.repeat(np.arange(counts.size), counts.ravel())
+                src = slot % n
+                # offset each cumulative row by its source floor so that the
+                # flattened table is sorted and one searchsorted picks every dst
+                cum = np.cumsum(period.od, axis=1) + np.arange(n)[:, None]
+                cum[:, -1] = np.arange(1, n + 1)
+                dst = np.searchsorted(cum.ravel(), src + rng.random(len(src)), side='right') - src * n
+                ticks.append(start + slot // n)
+                srcs.append(src)
+                dsts.append(dst)
+        return np.concatenate(ticks), np.concatenate(srcs), np.concatenate(dsts)
+
+    def arrivals_by_tick(self,
+                         n_ticks: int = None,
+                         scale: float = 1.0,
+                         rng: np.random.Generator = None) -> list[list[tuple[int, int]]]:
+        """
+        Same as sample(), but grouped into one list of (src, dst) pairs per
+        tick, the format State.update() takes.
+        """
+        if n_ticks is None:
+            n_ticks = self.day_length
+        tick, src, dst = self.sample(n_ticks, scale, rng)
+        bounds = np.searchsorted(tick, np.arange(n_ticks + 1))
+        pairs = list(zip(src.tolist(), dst.tolist()))
+        return [pairs[bounds[t]:bounds[t+1]] for t in range(n_ticks)]
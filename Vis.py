@@ -1,6 +1,3 @@
-from colorama import Style
-from colorama import Fore
-
 def pretty_list(target: list, lim: int = 60):
     rep = ''
     if len(target) == 0:
@@ -14,6 +11,7 @@ def pretty_list(target: list, lim: int = 60):
     return rep
 
 def pretty_dict(summary: dict) -> None:
+    from colorama import Fore, Style   # only needed when rendering
     print(f"\n#=============={Fore.BLUE}Summary{Style.RESET_ALL}==============#")
     for key, val in summary.items():
         print("| " + key.ljust(20) + "| " + str(val).ljust(12) + "|")
@@ -0,0 +1,97 @@
+from State import State
+
+import copy
+import math
+
+def batch_means(series: list[float], batch_size: int) -> list[float]:
+    """
+    Splits a series into consecutive batches and returns the mean of each
+    complete batch.
+    """
+    n_batches = len(series) // batch_size
+    return [sum(series[i*batch_size:(i+1)*batch_size]) / batch_size
+            for i in range(n_batches)]
+
+def is_steady(means: list[float], n_batches: int = 10, t_crit: float = 2.0) -> bool:
+    """
+    Checks that the last n_batches batch means show no trend: the slope of
+    a least squares line through them must be within t_crit standard errors
+    of 0. A queue that keeps growing fails this however slowly it grows.
+
+    Args:
+        means: the batch means so far
+        n_batches: the number of recent batches to fit, at least 3
+        t_crit: the number of standard errors the slope may differ from 0
+    Returns:
+        whether the series looks stationary
+    """
+    if len(means) < n_batches:
+        return False
+    ys = means[-n_batches:]
+    x_mean = (n_batches - 1) / 2
+    y_mean = sum(ys) / n_batches
+    sxx = sum((x - x_mean) ** 2 for x in range(n_batches))
+    slope = sum((x - x_mean) * (y - y_mean) for x, y in enumerate(ys)) / sxx
+    sse = sum((y - y_mean - slope * (x - x_mean)) ** 2 for x, y in enumerate(ys))
+    se = math.sqrt(sse / (n_batches - 2) / sxx)
+    return abs(slope) <= t_crit * se
+
+def warm_up(state: State,
+            batch_size: int = 10,
+            n_batches: int = 10,
+            t_crit: float = 2.0,
+            max_steps: int = 2000,
+            arrivals: list[list[tuple[int, int]]] = None) -> tuple[int, bool]:
+    """
+    Runs a state until its queue length and step cost reach steady state
+    (batch means method), then restarts its cost accounting.
+
+    Args:
+        state: the state to warm up, modified in place
+        batch_size: the number of steps per batch
+        n_batches: the number of recent batch means to test for a trend
+        t_crit: see is_steady()
+        max_steps: the max number of warm-up steps, the accounting is
+                   restarted even if steady state was not detected
+        arrivals: precomputed arrivals for each step, see State.update()
+    Returns:
+        (the number of warm-up steps taken, whether steady state was
+        reached). The flag is False when the building never settled within
+        max_steps, e.g. because it is overloaded and the queue keeps
+        growing, in which case long-run averages are meaningless.
+    """
+    queue, cost = [], []
+    steps = 0
+    steady = False
+    while steps < max_steps:
+        prev_cost = state.waiting_cost + state.distribution_cost
+        state.update(arrivals=None if arrivals is None else arrivals[steps])
+        steps += 1
+        queue.append(state.n_active)
+        cost.append(state.waiting_cost + state.distribution_cost - prev_cost)
+        if steps % batch_size == 0 \
+                and is_steady(batch_means(queue, batch_size), n_batches, t_crit) \
+                and is_steady(batch_means(cost, batch_size), n_batches, t_crit):
+            steady = True
+            break
+    state.reset_accounting()
+    return steps, steady
+
+def fork(snapshot: State, n: int, logic = None) -> list[State]:
+    """
+    Starts several evaluations from the same warmed-up building.
+
+    Args:
+        snapshot: the state to copy, e.g. from State.snapshot()
+        n: the number of copies
+        logic: if given, replaces the move logic of every copy. Each copy
+               gets its own deep copy, so stateful controllers do not share
+               their internal state across copies.
+    Returns:
+        the independent copies
+    """
+    states = [snapshot.snapshot() for _ in range(n)]
+    if logic is not None:
+        for state in states:
+            state.logic = copy.deepcopy(logic)
+    return states
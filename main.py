@@ -1,77 +1,281 @@
-from State import State
+from State import State, StatePool
 from Vis import pretty_dict
 from time import sleep
 import Constants
 import os
 import time
-import multiprocessing
 import Models
+from Physics import Physics
 
-def simulate(state: State = State(),
+import argparse
+
+# controllers selectable from the command line, GroupDispatch keeps state so
+# every run gets a fresh instance
+LOGICS = ['scan', 'look', 'c_look', 'dispatch']
+
+def make_logic(name: str):
+    if name == 'dispatch':
+        return Models.GroupDispatch()
+    return getattr(Models, name)
+
+def simulate(state: State = None,
             test_cycles: int = Constants.N_STEPS,
             max_linger: int = Constants.N_TRAILING_STEPS,
             cycle_print_delay: float = Constants.PRINT_DELAY_S,
-            show: bool = True) -> float:
+            show: bool = True,
+            live_fps: float = None) -> float:
+    """
+    Runs a state. With show, every step is printed and followed by
+    cycle_print_delay. With live_fps, a Dashboard is redrawn at most live_fps
+    times per second while the simulation runs at full speed.
+    """
+    if state is None:
+        state = State(logic=Models.look,
+                      floors=Constants.N_FLOORS,
+                      n_elevators=Constants.N_ELEVATORS,
+                      avg_ppl=Constants.AVG_PPL_PER_FLOOR_TICK)
+    dashboard = None
+    if live_fps is not None:
+        from Dashboard import Dashboard
+        dashboard = Dashboard(target_fps=live_fps)
+        dashboard.attach(state)
+        show = False
     try:
         for _ in range(test_cycles):
             if show:
                 # os.system('cls')
                 print(state)
                 sleep(cycle_print_delay)
+            elif dashboard is not None:
+                dashboard.render(state)
             state.update()
         counter = 0
-        while len(state.active_ppl()) != 0 and counter < max_linger:
+        while state.n_active != 0 and counter < max_linger:
             if show:
                 # os.system('cls')
                 print(state)
                 sleep(cycle_print_delay)
+            elif dashboard is not None:
+                dashboard.render(state)
             state.update(add_ppl=False)
             counter += 1
     except KeyboardInterrupt:
         pass
+    if dashboard is not None:
+        dashboard.render(state, force=True)
+        dashboard.detach()
+        show = True
     if show:
         pretty_dict(state.summarize())
 
-def simulate_full():
-    state = State(logic=None,
-                    floors=Constants.N_FLOORS,
-                    n_elevators=Constants.N_ELEVATORS,
-                    avg_ppl=Constants.AVG_PPL_PER_FLOOR_TICK)
+STATE_POOL = StatePool(logic=Models.look,
+                       floors=Constants.N_FLOORS,
+                       n_elevators=Constants.N_ELEVATORS,
+                       avg_ppl=Constants.AVG_PPL_PER_FLOOR_TICK)
+
+def simulate_full(seed: int = None) -> float:
+    state = STATE_POOL.acquire(seed=seed)
     simulate(state, max_linger=0, show=False)
+    cost = state.total_cost()
+    STATE_POOL.release(state)
+    return cost
 
 TEST_CYCLES = 10000
 
-def single():
+def single(n_runs: int = TEST_CYCLES):
     start = time.perf_counter()
-    for _ in range(TEST_CYCLES):
+    for _ in range(n_runs):
         simulate_full()
     end = time.perf_counter()
-    print(f'single = {(end-start)/TEST_CYCLES * 1000 :.3f} ms')
+    print(f'single = {(end-start)/n_runs * 1000 :.3f} ms')
+
+def _core_repeat(results_spec, first: int, n_runs: int):
+    import random
+    from Shared import SharedArray
+    random.seed()   # forked processes would otherwise all draw the same arrivals
+    with SharedArray.attach(results_spec) as results:
+        for run in range(first, first + n_runs):
+            results.array[run] = simulate_full()
 
-def multi():
-    cpu_cnt = multiprocessing.cpu_count()
+def multi(n_runs: int = TEST_CYCLES):
+    import multiprocessing
+    from Shared import SharedArray
+    if n_runs < 1:
+        raise ValueError("Need at least one run")
+    # no idle workers when there are fewer runs than cores, and the last
+    # workers take one extra run each when the runs do not split evenly
+    n_procs = min(multiprocessing.cpu_count(), n_runs)
+    per_core, extra = divmod(n_runs, n_procs)
     start = time.perf_counter()
     processes = []
-    def core_repeat():
-        for _ in range(int(TEST_CYCLES / cpu_cnt)):
-            simulate_full()
-    # initiate processes
-    for _ in range(cpu_cnt):
-        core_task = multiprocessing.Process(target=core_repeat())
-        core_task.start()
-        processes.append(core_task)
-    # wait for all to finish
-    for process in processes:
-        process.join()
+    # every process writes its costs straight into one shared results array
+    with SharedArray.create((n_runs,)) as results:
+        # initiate processes
+        first = 0
+        for core in range(n_procs):
+            core_runs = per_core + (core >= n_procs - extra)
+            core_task = multiprocessing.Process(target=_core_repeat,
+                                                args=(results.spec, first, core_runs))
+            core_task.start()
+            processes.append(core_task)
+            first += core_runs
+        # wait for all to finish
+        for process in processes:
+            process.join()
+        mean_cost = results.array.mean()
     end = time.perf_counter()
-    print(f'multi = {(end-start)/TEST_CYCLES * 1000 :.3f} ms')
+    print(f'multi = {(end-start)/n_runs * 1000 :.3f} ms, mean cost = {mean_cost:.3f}')
+
+def _sample_runs(avg_ppl: float, n_runs: int, floors: int, test_cycles: int) -> list:
+    """
+    Draws the arrivals of n_runs runs, to be shared by every controller.
+    """
+    state = State(floors=floors, avg_ppl=avg_ppl)
+    return [[state.sample_arrivals() for _ in range(test_cycles)] for _ in range(n_runs)]
+
+def _run_cell(logic: str, trace, results, floors: int, n_elevators: int, test_cycles: int,
+              first: int = 0) -> None:
+    """
+    Runs one controller on consecutive runs of a trace, starting at run
+    first, writing one row of Shared.RESULT_FIELDS per run into results.
+    """
+    from Shared import unpack_run
+    pool = StatePool(floors=floors, n_elevators=n_elevators)
+    for row in range(len(results)):
+        state = pool.acquire(logic=make_logic(logic))
+        for arrivals in unpack_run(trace, first + row, test_cycles):
+            state.update(arrivals=arrivals)
+        results[row] = (state.total_cost(), state.total_ppl, state.n_active, state.time)
+        pool.release(state)
+
+def _sweep_worker(task: tuple) -> None:
+    from Shared import SharedArray, Trace
+    logic, offsets_spec, pairs_spec, results_spec, row, runs, floors, n_elevators, test_cycles = task
+    first, last = runs
+    with SharedArray.attach(offsets_spec) as offsets, \
+            SharedArray.attach(pairs_spec) as pairs, \
+            SharedArray.attach(results_spec) as results:
+        _run_cell(logic, Trace(offsets.array, pairs.array), results.array[row + first:row + last],
+                  floors, n_elevators, test_cycles, first)
+
+def sweep(logics: list[str],
+          avg_ppls: list[float],
+          n_runs: int = 100,
+          floors: int = Constants.N_FLOORS,
+          n_elevators: int = Constants.N_ELEVATORS,
+          test_cycles: int = Constants.N_STEPS,
+          procs: int = 1,
+          seed: int = None) -> dict:
+    """
+    Runs every controller at every arrival rate. The arrivals are drawn once
+    per rate and shared by all the controllers. With several processes, the
+    arrival traces and the results live in shared memory, so workers only
+    receive array names and write their metrics in place. Each controller's
+    runs at each rate are split into about procs chunks, so that all the
+    processes stay busy even when there are few controllers and rates.
+
+    Returns:
+        a dictionary of {(logic, avg_ppl) : mean total cost}
+    """
+    import random
+    import numpy as np
+    from Shared import RESULT_FIELDS, SharedArray, pack_trace
+    if seed is not None:
+        random.seed(seed)
+    traces = [pack_trace(_sample_runs(avg_ppl, n_runs, floors, test_cycles)) for avg_ppl in avg_ppls]
+    cells = [(logic, rate) for logic in logics for rate in range(len(avg_ppls))]
+    results = np.zeros((len(cells) * n_runs, len(RESULT_FIELDS)))
+    if procs > 1:
+        import multiprocessing
+        shared = [(SharedArray.from_array(trace.offsets), SharedArray.from_array(trace.pairs))
+                  for trace in traces]
+        shared_results = SharedArray.from_array(results)
+        try:
+            chunk = -(-n_runs // procs)
+            tasks = [(logic, shared[rate][0].spec, shared[rate][1].spec, shared_results.spec,
+                      i * n_runs, (first, min(first + chunk, n_runs)), floors, n_elevators, test_cycles)
+                     for i, (logic, rate) in enumerate(cells)
+                     for first in range(0, n_runs, chunk)]
+            with multiprocessing.Pool(procs) as workers:
+                workers.map(_sweep_worker, tasks)
+            results[...] = shared_results.array
+        finally:
+            shared_results.close()
+            for offsets, pairs in shared:
+                offsets.close()
+                pairs.close()
+    else:
+        for i, (logic, rate) in enumerate(cells):
+            _run_cell(logic, traces[rate], results[i * n_runs:(i + 1) * n_runs],
+                      floors, n_elevators, test_cycles)
+    return {(logic, avg_ppls[rate]): float(results[i * n_runs:(i + 1) * n_runs, 0].mean())
+            for i, (logic, rate) in enumerate(cells)}
+
+def _parse_args(argv: list[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Elevator system simulation")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def add_building_args(sub: argparse.ArgumentParser) -> None:
+        sub.add_argument('--floors', type=int, default=Constants.N_FLOORS)
+        sub.add_argument('--elevators', type=int, default=Constants.N_ELEVATORS)
+        sub.add_argument('--steps', type=int, default=Constants.N_STEPS)
+        sub.add_argument('--seed', type=int, default=None)
+
+    sim = commands.add_parser('simulate', help="run and display a single simulation")
+    add_building_args(sim)
+    sim.add_argument('--logic', choices=LOGICS, default='look')
+    sim.add_argument('--avg-ppl', type=float, default=Constants.AVG_PPL_PER_FLOOR_TICK)
+    sim.add_argument('--linger', type=int, default=Constants.N_TRAILING_STEPS)
+    sim.add_argument('--delay', type=float, default=Constants.PRINT_DELAY_S)
+    sim.add_argument('--headless', action='store_true', help="only print the summary")
+    sim.add_argument('--physics', action='store_true', help="model travel and door dwell times")
+    sim.add_argument('--live', type=float, default=None, metavar='FPS',
+                     help="run at full speed with a dashboard redrawn at most FPS times per second")
+
+    bench = commands.add_parser('bench', help="time many short default simulations")
+    bench.add_argument('--runs', type=int, default=TEST_CYCLES)
+    bench.add_argument('--multi', action='store_true', help="use one process per core")
+
+    train = commands.add_parser('train', help="train the GANN controllers (needs pygad)")
+    train.add_argument('--generations', type=int, default=100)
+
+    sweep_cmd = commands.add_parser('sweep', help="compare controllers over arrival rates")
+    add_building_args(sweep_cmd)
+    sweep_cmd.add_argument('--logic', choices=LOGICS, nargs='+', default=['scan', 'look'])
+    sweep_cmd.add_argument('--avg-ppl', type=float, nargs='+', default=[Constants.AVG_PPL_PER_FLOOR_TICK])
+    sweep_cmd.add_argument('--runs', type=int, default=100)
+    sweep_cmd.add_argument('--procs', type=int, default=1)
+    return parser.parse_args(argv)
+
+def main(argv: list[str] = None) -> None:
+    args = _parse_args(argv)
+    if args.command == 'simulate':
+        state = State(logic=make_logic(args.logic),
+                      floors=args.floors,
+                      n_elevators=args.elevators,
+                      avg_ppl=args.avg_ppl,
+                      physics=Physics(args.floors) if args.physics else None)
+        state.reset(args.seed)
+        simulate(state, test_cycles=args.steps, max_linger=args.linger,
+                 cycle_print_delay=args.delay, show=not args.headless,
+                 live_fps=None if args.headless else args.live)
+        if args.headless:
+            pretty_dict(state.summarize())
+    elif args.command == 'bench':
+        if args.multi:
+            multi(args.runs)
+        else:
+            single(args.runs)
+    elif args.command == 'train':
+        import Train
+        Train.train(num_generations=args.generations)
+    elif args.command == 'sweep':
+        results = sweep(args.logic, args.avg_ppl, n_runs=args.runs, floors=args.floors,
+                        n_elevators=args.elevators, test_cycles=args.steps,
+                        procs=args.procs, seed=args.seed)
+        pretty_dict({f'{logic} @ {avg_ppl}': round(cost, 3)
+                     for (logic, avg_ppl), cost in results.items()})
 
 
 if __name__ == "__main__":
-    # single()    # approximately 1.9 ms per 20-step simulation * 10000
-    # multi()     # approximately 1.5 ms per 20-step simulation * 10000....
-    state = State(logic=Models.look,
-                    floors=Constants.N_FLOORS,
-                    n_elevators=Constants.N_ELEVATORS,
-                    avg_ppl=Constants.AVG_PPL_PER_FLOOR_TICK)
-    simulate(state, max_linger=0, show=True)
\ No newline at end of file
+    main()
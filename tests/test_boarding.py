@@ -0,0 +1,64 @@
+import random
+
+import numpy as np
+
+from Elevator import Elevator, board_counts, board_counts_batch
+from Env import VecEnv, decode_action
+from Person import Person
+
+def reference_counts(loads: list[int], capacities: list[int], n_waiting: int) -> list[int]:
+    # one person at a time into the least filled car with room, first on ties
+    loads = list(loads)
+    counts = [0] * len(loads)
+    for _ in range(n_waiting):
+        open_cars = [i for i in range(len(loads)) if loads[i] < capacities[i]]
+        if not open_cars:
+            break
+        i = min(open_cars, key=lambda i: loads[i])
+        loads[i] += 1
+        counts[i] += 1
+    return counts
+
+def test_board_counts_matches_one_at_a_time():
+    random.seed(0)
+    for _ in range(5000):
+        n = random.randint(1, 5)
+        capacities = [random.randint(1, 10) for _ in range(n)]
+        loads = [random.randint(0, cap) for cap in capacities]
+        n_waiting = random.randint(0, 40)
+        assert board_counts(loads, capacities, n_waiting) == \
+            reference_counts(loads, capacities, n_waiting)
+
+def test_add_people_stops_at_capacity():
+    elevator = Elevator(max_floors=5, ppl_max=3)
+    people = [Person(0, 4) for _ in range(5)]
+    assert elevator.add_people(people) == 3
+    assert len(elevator.ppl) == 3
+
+def test_board_counts_batch_matches_board_counts():
+    rng = np.random.default_rng(0)
+    capacities = rng.integers(0, 10, (3000, 4))
+    loads = rng.integers(0, 11, (3000, 4)) % (capacities + 1)
+    n_waiting = rng.integers(0, 40, 3000)
+    batch = board_counts_batch(loads, capacities, n_waiting).tolist()
+    for row, load, cap, n in zip(batch, loads.tolist(), capacities.tolist(), n_waiting.tolist()):
+        assert row == board_counts(load, cap, n)
+
+def test_vec_env_boarding_matches_single_states():
+    # the same actions and arrivals, boarded in one batch and one state at a time
+    env = VecEnv(6, max_steps=80, floors=6, n_elevators=3, avg_ppl=0.6)
+    env.reset(seed=2)
+    singles = [state.snapshot() for state in env.states]
+    rng = np.random.default_rng(2)
+    for t in range(79):
+        actions = rng.integers(0, env.n_actions, (6, 3))
+        random.seed(t)
+        env.step(actions)
+        random.seed(t)
+        for state, row in zip(singles, actions.tolist()):
+            moves = [decode_action(index, env.v_max) for index in row]
+            state.update(actions=[min(max(a, -e.loc), state.n_floors - 1 - e.loc) if isinstance(a, int) else a
+                                  for e, a in zip(state.elevators, moves)])
+    for state, single in zip(env.states, singles):
+        assert [len(e.ppl) for e in state.elevators] == [len(e.ppl) for e in single.elevators]
+        assert state.total_cost() == single.total_cost()
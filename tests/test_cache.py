@@ -0,0 +1,53 @@
+import random
+
+import Constants
+import Models
+from Cache import DecisionCache
+from State import FloorCalls, State
+
+def _random_view(n_floors: int, n_cars: int, v_max: int) -> dict:
+    actions = [None, Constants.OPEN_UP, Constants.OPEN_DOWN] + list(range(-v_max, v_max + 1))
+    view = {}
+    for i in range(n_cars):
+        last = random.choice(actions)
+        view[f'E{i}'] = {'destinations' : [random.random() < 0.2 for _ in range(n_floors)],
+                         'location' : random.randrange(n_floors),
+                         'past' : [] if last is None else [last]}
+    view['hall_calls'] = [FloorCalls(random.random() < 0.2, random.random() < 0.2)
+                          for _ in range(n_floors)]
+    view['n_floors'] = n_floors
+    view['v_max'] = v_max
+    return view
+
+def _identity(view: dict) -> tuple:
+    cars = tuple((tuple(view[f'E{i}']['destinations']), view[f'E{i}']['location'],
+                  tuple(view[f'E{i}']['past'][-1:]))
+                 for i in range(len(view) - 3))
+    return cars, tuple(view['hall_calls']), view['n_floors'], view['v_max']
+
+def test_distinct_views_get_distinct_keys():
+    random.seed(0)
+    keys = {}
+    for _ in range(20000):
+        view = _random_view(random.randint(2, 5), random.randint(1, 2), random.randint(1, 3))
+        key = DecisionCache.key(view)
+        identity = _identity(view)
+        assert keys.setdefault(key, identity) == identity
+
+def test_last_move_does_not_spill_into_location():
+    random.seed(1)
+    view = _random_view(8, 1, 2)
+    view['E0']['location'], view['E0']['past'] = 3, [2]
+    up = DecisionCache.key(view)
+    view['E0']['location'], view['E0']['past'] = 4, [-2]
+    assert DecisionCache.key(view) != up
+
+def test_cached_decisions_match_uncached():
+    results = []
+    for logic in (Models.look, DecisionCache(Models.look)):
+        state = State(logic=logic, floors=8, n_elevators=2, avg_ppl=0.3)
+        state.reset(seed=3)
+        for _ in range(500):
+            state.update()
+        results.append(state.summarize())
+    assert results[0] == results[1]
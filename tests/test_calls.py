@@ -0,0 +1,29 @@
+import random
+
+import Models
+from State import FloorCalls, State, pack_calls, pack_floors, unpack_calls, unpack_floors
+
+def test_packed_calls_match_the_lists():
+    state = State(logic=Models.look, floors=9, n_elevators=3, avg_ppl=0.4)
+    state.reset(0)
+    for _ in range(200):
+        state.update()
+        calls = state.hall_calls()
+        bits = 0
+        for floor, ppl in enumerate(state.floors):
+            for person in ppl:
+                bits |= 1 << (2 * floor + (person.dst < floor))
+        assert pack_calls(calls) == bits
+        assert unpack_calls(bits, state.n_floors) == calls
+        for elevator in state.elevators:
+            pressed = [floor in elevator.destinations() for floor in range(state.n_floors)]
+            assert elevator.destination_bits() == pack_floors(pressed)
+
+def test_unpack_inverts_pack():
+    random.seed(0)
+    for _ in range(1000):
+        n = random.randint(1, 12)
+        calls = [FloorCalls(random.random() < 0.3, random.random() < 0.3) for _ in range(n)]
+        pressed = [random.random() < 0.3 for _ in range(n)]
+        assert unpack_calls(pack_calls(calls), n) == calls
+        assert unpack_floors(pack_floors(pressed), n) == pressed
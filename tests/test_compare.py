@@ -0,0 +1,49 @@
+import random
+
+import Models
+from Compare import _excludes_zero, _look_schedule, _simultaneous_cis, _t_critical, paired_compare
+
+def test_t_critical_close_to_tables():
+    assert abs(_t_critical(5, 0.95) - 2.571) < 0.01
+    assert abs(_t_critical(9, 0.995) - 3.690) < 0.05
+    assert abs(_t_critical(30, 0.95) - 2.042) < 0.005
+
+def test_sequential_error_rate_under_null():
+    # three controllers no different from the baseline, looked at with the
+    # same schedule and error split as paired_compare
+    random.seed(0)
+    looks = _look_schedule(10, 320)
+    alpha = 0.05 / len(looks)
+    n_trials = 400
+    false_alarms = 0
+    for _ in range(n_trials):
+        diffs = {name: [] for name in 'abc'}
+        for look in looks:
+            for samples in diffs.values():
+                while len(samples) < look:
+                    samples.append(random.gauss(0, 1))
+            if any(map(_excludes_zero, _simultaneous_cis(diffs, alpha).values())):
+                false_alarms += 1
+                break
+    assert false_alarms / n_trials <= 0.05
+
+def test_identical_controllers_run_to_max_runs():
+    result = paired_compare({'a': Models.look, 'b': Models.look}, seed=1,
+                            min_runs=5, max_runs=20, floors=5, n_elevators=1,
+                            avg_ppl=0.1, test_cycles=30, max_linger=10)
+    assert result['runs'] == 20
+    assert not result['significant']
+    assert result['b']['diff'] == 0
+
+def test_first_look_has_enough_runs():
+    assert _look_schedule(2, 40)[0] == 5
+
+def test_significant_means_ci_excludes_zero():
+    result = paired_compare({'scan': Models.scan, 'look': Models.look,
+                             'c_look': Models.c_look, 'scan2': Models.scan}, seed=1,
+                            min_runs=10, max_runs=160, floors=7, n_elevators=1,
+                            avg_ppl=0.1, test_cycles=50, max_linger=20)
+    for name in ('look', 'c_look', 'scan2'):
+        lo, hi = result[name]['ci']
+        assert result[name]['significant'] == (lo > 0 or hi < 0)
+    assert not result['scan2']['significant']
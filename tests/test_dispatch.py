@@ -0,0 +1,45 @@
+import numpy as np
+
+from Dispatch import GroupDispatch
+from Physics import Physics
+from State import State
+
+def _checked(dispatch: GroupDispatch, state: State, log: list):
+    # runs the controller and checks its bookkeeping on every tick
+    def logic(view: dict) -> list:
+        directions = dispatch.direction.copy() if dispatch.n_cars else None
+        actions = dispatch(view)
+        pending = np.array([[call.up, call.dn] for call in view['hall_calls']]).ravel()
+        assert ((dispatch.owner >= -1) & (dispatch.owner < len(state.elevators))).all()
+        assert (dispatch.owner[~pending] == -1).all()
+        for i, (action, elevator) in enumerate(zip(actions, state.elevators)):
+            if isinstance(action, int):
+                assert -view['v_max'] <= action <= view['v_max']
+                assert 0 <= elevator.loc + action < view['n_floors']
+            if view[f'E{i}']['busy'] > 0 and directions is not None:
+                assert dispatch.direction[i] == directions[i]
+        log.append(actions)
+        return actions
+    return logic
+
+def _run(dispatch: GroupDispatch, state: State, seed: int, n_steps: int = 200) -> list:
+    log = []
+    state.logic = _checked(dispatch, state, log)
+    state.reset(seed)
+    for _ in range(n_steps):
+        state.update()
+    return log
+
+def test_ownership_and_moves_stay_valid():
+    for physics in (None, Physics(9)):
+        state = State(floors=9, n_elevators=3, avg_ppl=0.3, physics=physics)
+        _run(GroupDispatch(), state, seed=0)
+        assert state.total_ppl > 0
+
+def test_reused_instance_starts_clean():
+    dispatch = GroupDispatch()
+    state = State(floors=8, n_elevators=2, avg_ppl=0.3)
+    _run(dispatch, state, seed=1)
+    reused = _run(dispatch, state, seed=2)
+    fresh = _run(GroupDispatch(), State(floors=8, n_elevators=2, avg_ppl=0.3), seed=2)
+    assert reused == fresh
@@ -0,0 +1,53 @@
+import numpy as np
+
+import Constants
+import Models
+from Env import VecEnv
+from State import State
+
+def test_rewards_add_up_to_final_cost():
+    env = VecEnv(8, max_steps=50, floors=6, n_elevators=2, avg_ppl=0.2)
+    env.reset(seed=0)
+    rng = np.random.default_rng(0)
+    returns = np.zeros(8)
+    for _ in range(50):
+        _, rewards, dones, info = env.step(rng.integers(0, env.n_actions, (8, 2)))
+        returns += rewards
+    assert dones.all()
+    np.testing.assert_allclose(returns, -info['episode_cost'], rtol=1e-9)
+
+def _look_actions(env: VecEnv) -> np.ndarray:
+    # Models.look's actions as VecEnv action indices
+    actions = []
+    for state in env.states:
+        row = []
+        for action in Models.look(state.sys_view()):
+            if isinstance(action, int):
+                row.append(action + env.v_max)
+            else:
+                row.append(2 * env.v_max + (1 if action == Constants.OPEN_UP else 2))
+        actions.append(row)
+    return np.array(actions)
+
+def test_serving_earns_more_than_idling():
+    # same seed, so both policies see the same arrivals
+    returns = {}
+    for policy in ('idle', 'look'):
+        env = VecEnv(4, max_steps=200, floors=6, n_elevators=2, avg_ppl=0.2)
+        env.reset(seed=1)
+        returns[policy] = np.zeros(4)
+        for _ in range(199):
+            actions = np.full((4, 2), env.v_max) if policy == 'idle' else _look_actions(env)
+            _, rewards, _, _ = env.step(actions)
+            returns[policy] += rewards
+    assert (returns['look'] > returns['idle']).all()
+
+def test_live_cost_sums_match_people():
+    state = State(logic=Models.look, floors=8, n_elevators=2, avg_ppl=0.3)
+    state.reset(seed=2)
+    for _ in range(200):
+        state.update()
+        people = list(state.active_ppl())
+        assert state.active_time == sum(p.time for p in people)
+        assert state.active_cost == sum(p.cost() for p in people)
+    assert state.total_cost() == state.total_cost()
@@ -0,0 +1,37 @@
+import Models
+from Physics import Physics
+from State import State
+import Constants
+
+def test_door_dwell_scales_with_boarding():
+    physics = Physics(5)
+    state = State(floors=5, n_elevators=1, physics=physics)
+    state.add_ppl([(0, 3)] * 15)
+    state.update(add_ppl=False, actions=[Constants.OPEN_UP])
+    elevator = state.elevators[0]
+    assert len(elevator.ppl) == 15
+    assert elevator.busy == physics.dwell_ticks(15) - 1
+    # the car ignores its actions until the doors are done
+    for _ in range(elevator.busy):
+        state.update(add_ppl=False, actions=[1])
+        assert elevator.loc == 0
+    state.update(add_ppl=False, actions=[1])
+    assert elevator.loc == 1
+
+def test_travel_ticks_grow_with_distance():
+    physics = Physics(10)
+    row = physics.travel_ticks[0]
+    assert row[0] == 1
+    assert all(a <= b for a, b in zip(row, row[1:]))
+
+def test_moves_past_the_ends_stay_inside():
+    # the baseline controllers overshoot in a 2-floor building
+    for logic in (Models.scan, Models.look):
+        state = State(logic=logic, floors=2, n_elevators=2, avg_ppl=0.3, physics=Physics(2))
+        state.reset(0)
+        for _ in range(100):
+            state.update()
+            assert all(0 <= elevator.loc <= 1 for elevator in state.elevators)
+    state = State(floors=3, n_elevators=1, avg_ppl=0, physics=Physics(3))
+    state.update(add_ppl=False, actions=[-2])
+    assert state.elevators[0].loc == 0 and state.elevators[0].past[-1] == 0
@@ -0,0 +1,17 @@
+import random
+
+import main
+from Shared import pack_trace, unpack_run
+
+def test_trace_round_trip():
+    random.seed(0)
+    runs = [[[(random.randrange(6), random.randrange(6)) for _ in range(random.randint(0, 3))]
+             for _ in range(7)] for _ in range(5)]
+    trace = pack_trace(runs)
+    for run in range(5):
+        assert unpack_run(trace, run, 7) == runs[run]
+
+def test_sweep_is_the_same_in_parallel():
+    args = dict(logics=['scan', 'look'], avg_ppls=[0.1, 0.3], n_runs=7,
+                floors=6, n_elevators=2, test_cycles=40, seed=3)
+    assert main.sweep(procs=1, **args) == main.sweep(procs=2, **args)
@@ -0,0 +1,38 @@
+import numpy as np
+
+from Traffic import TrafficModel
+
+def test_sample_matches_periods():
+    n_floors, day_length, scale = 6, 200, 40
+    model = TrafficModel.office_day(n_floors, day_length=day_length, avg_ppl=0.1)
+    n_ticks = day_length * 3 // 2   # the second day is cut in the middle
+    tick, src, dst = model.sample(n_ticks, scale=scale, rng=np.random.default_rng(0))
+    assert (np.diff(tick) >= 0).all()
+    assert tick.min() >= 0 and tick.max() < n_ticks
+    assert (src != dst).all()
+    assert ((0 <= dst) & (dst < n_floors)).all()
+
+    period = np.array([model.periods.index(model.period_at(t)) for t in range(n_ticks)])
+    for p, spec in enumerate(model.periods):
+        in_period = period[tick] == p
+        n_period_ticks = (period == p).sum()
+        # arrivals per floor against the Poisson rate
+        expected = spec.rates * scale * n_period_ticks
+        counts = np.bincount(src[in_period], minlength=n_floors)
+        assert (np.abs(counts - expected) <= 5 * np.sqrt(expected) + 1).all()
+        # destination frequencies of each source floor against the OD row
+        for floor in range(n_floors):
+            dsts = dst[in_period & (src == floor)]
+            if len(dsts) < 100:
+                continue
+            freq = np.bincount(dsts, minlength=n_floors) / len(dsts)
+            od = spec.od[floor]
+            assert (np.abs(freq - od) <= 5 * np.sqrt(od * (1 - od) / len(dsts)) + 1e-9).all()
+
+def test_arrivals_by_tick_groups_the_sample():
+    model = TrafficModel.office_day(5, day_length=100)
+    arrivals = model.arrivals_by_tick(scale=5, rng=np.random.default_rng(1))
+    tick, src, dst = model.sample(scale=5, rng=np.random.default_rng(1))
+    assert len(arrivals) == 100
+    assert [pair for step in arrivals for pair in step] == list(zip(src.tolist(), dst.tolist()))
+    assert [len(step) for step in arrivals] == np.bincount(tick, minlength=100).tolist()
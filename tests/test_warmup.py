@@ -0,0 +1,42 @@
+import random
+
+import Models
+from Dispatch import GroupDispatch
+from State import State
+from Warmup import fork, is_steady, warm_up
+
+def test_slow_growth_is_not_steady():
+    random.seed(0)
+    ramp = [0.5 * i + random.gauss(0, 1) for i in range(10)]
+    flat = [5 + random.gauss(0, 1) for _ in range(10)]
+    assert not is_steady(ramp)
+    assert is_steady(flat)
+
+def test_overloaded_building_reports_no_steady_state():
+    state = State(logic=Models.look, floors=7, n_elevators=1, avg_ppl=1.5)
+    state.reset(0)
+    steps, steady = warm_up(state, max_steps=500)
+    assert (steps, steady) == (500, False)
+
+def test_only_the_wait_after_warm_up_is_charged():
+    state = State(logic=Models.look, floors=7, n_elevators=1, avg_ppl=0.5)
+    state.reset(0)
+    warm_up(state, max_steps=200)
+    assert state.n_active > 0
+    warm = sum(person.time ** 2 for person in state.active_ppl())
+    assert state.waiting_cost + state.active_cost == 0
+    state.wait_log = []
+    for _ in range(20):
+        state.update(add_ppl=False)
+    times = [person.time for person in state.active_ppl()]
+    assert state.active_time == sum(times)
+    assert state.active_cost == sum(t * t for t in times)
+    # everyone in the window was there during the warm-up
+    charged = sum(t * t for t in state.wait_log) + state.active_cost - warm
+    assert state.waiting_cost + state.active_cost == charged
+
+def test_forks_do_not_share_the_controller():
+    state = State(logic=Models.look, floors=6, n_elevators=2, avg_ppl=0.2)
+    state.reset(0)
+    states = fork(state.snapshot(), 3, logic=GroupDispatch())
+    assert len({id(s.logic) for s in states}) == 3